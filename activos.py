@@ -0,0 +1,85 @@
+# activos.py
+# Variantes optimizadas de las imágenes estáticas del encabezado.
+# Los PNG originales pesan más de 1 MB cada uno pero se muestran a 150 y 600 px;
+# aquí se redimensionan al ancho en que se muestran y se comprimen (WebP).
+#
+# Con `server.enableStaticServing` (ver .streamlit/config.toml) las variantes
+# se publican en static/imagenes/ con el hash del contenido en el nombre: el
+# navegador las descarga una vez y las revalida con ETag. Sin static serving
+# se entrega un PNG ya al ancho final, que st.image envía sin recodificar.
+
+import hashlib
+import io
+import logging
+from pathlib import Path
+
+from PIL import Image, features
+
+import config
+from ingesta import escribir_atomico
+
+log = logging.getLogger(__name__)
+
+# Carpeta `static` de la app (junto a app.py), servida en /app/static/
+DIR_STATIC = Path(__file__).resolve().parent / 'static'
+
+# Sin soporte de WebP en Pillow se usa PNG optimizado
+FORMATO_WEB = 'WEBP' if features.check('webp') else 'PNG'
+
+
+def _codificar(imagen: Image.Image, formato: str) -> bytes:
+    salida = io.BytesIO()
+    if formato == 'WEBP':
+        imagen.save(salida, format='WEBP', quality=85, method=6)
+    else:
+        imagen.save(salida, format='PNG', optimize=True)
+    return salida.getvalue()
+
+
+def variante_imagen(ruta, ancho: int, formato: str = FORMATO_WEB, densidad: int = 1) -> bytes:
+    """Bytes de la imagen reducida a ``ancho * densidad`` px y codificada en `formato`.
+
+    La variante se guarda en config.DIR_CACHE/imagenes con un nombre que
+    depende del archivo original, su fecha y el tamaño pedido, para que los
+    demás procesos (y los próximos arranques) no tengan que recalcularla.
+    """
+    ruta = Path(ruta)
+    estado = ruta.stat()
+    firma = f'{ruta.resolve()}|{estado.st_mtime_ns}|{estado.st_size}|{ancho}|{densidad}|{formato}'
+    destino = config.DIR_CACHE / 'imagenes' / f'{ruta.stem}-{hashlib.sha1(firma.encode()).hexdigest()[:12]}.{formato.lower()}'
+    if destino.exists():
+        return destino.read_bytes()
+
+    with Image.open(ruta) as imagen:
+        objetivo = ancho * densidad
+        if imagen.width > objetivo:
+            imagen = imagen.resize((objetivo, round(imagen.height * objetivo / imagen.width)), Image.LANCZOS)
+        contenido = _codificar(imagen, formato)
+
+    try:
+        _guardar(destino, contenido)
+    except OSError as e:
+        log.warning('No se pudo guardar la variante de %s: %s', ruta, e)
+    log.info('%s a %d px: %d KB -> %d KB', ruta.name, ancho, estado.st_size // 1024, len(contenido) // 1024)
+    return contenido
+
+
+def _guardar(destino: Path, contenido: bytes) -> None:
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    # Temporal con el pid: varios workers pueden generar la misma variante a la vez
+    escribir_atomico(destino, lambda tmp: tmp.write_bytes(contenido))
+
+
+def publicar_imagen(ruta, ancho: int) -> str:
+    """Publica la variante web (con densidad config.IMAGENES_DENSIDAD) en static/ y devuelve su URL.
+
+    El nombre incluye el hash del contenido, así que una imagen nueva nunca
+    choca con la copia que el navegador tenga guardada. Lanza OSError si no se
+    puede escribir en static/ (p. ej. la app está en una carpeta de solo lectura).
+    """
+    contenido = variante_imagen(ruta, ancho, densidad=config.IMAGENES_DENSIDAD)
+    nombre = f'{Path(ruta).stem}-{ancho}w-{hashlib.sha1(contenido).hexdigest()[:10]}.{FORMATO_WEB.lower()}'
+    destino = DIR_STATIC / 'imagenes' / nombre
+    if not destino.exists():
+        _guardar(destino, contenido)
+    return f'/app/static/imagenes/{nombre}'
@@ -0,0 +1,173 @@
+# agregaciones.py
+# Agregaciones compartidas por las dos pestañas de la app.
+# - Núcleos vectorizados (sin lambdas por grupo ni por fila) para la tabla
+#   pivote, los porcentajes por nivel y las etiquetas de competencia.
+# - Cubo de agregados precalculados para la pestaña "Resultados IEMs": se
+#   construye una vez al cargar los datos y cada interacción solo filtra y
+#   consolida tablas pequeñas en lugar de volver a recorrer las filas.
+
+import numpy as np
+import pandas as pd
+
+from indices import IndiceFiltros
+from ingesta import unir_categorias
+
+# Dimensiones por las que se puede filtrar o agrupar un resultado
+DIMENSIONES = ['REGION', 'NOMBRE IEM', 'MUNICIPIO', 'GRADO', 'GENERO', 'EVALUACION']
+# Claves de las dos tablas del cubo
+CLAVES_ESTUDIANTES = DIMENSIONES + ['NUM_DOCUMENTO']
+CLAVES_CELDAS = DIMENSIONES + ['COMPETENCIA', 'NIVEL_DE_DESEMPENO']
+
+
+# ---------------- Núcleos vectorizados ----------------
+def promedio_0_100(suma: pd.Series, n: pd.Series) -> pd.Series:
+    """Promedio en escala 0-100 redondeado a 2 decimales a partir de sumas y conteos."""
+    return (suma / n.replace(0, np.nan) * 100).round(2)
+
+
+def _a_tabla(promedio: pd.Series, columns: str) -> pd.DataFrame:
+    """Pasa a formato ancho como lo hace pivot_table (sin filas ni columnas vacías)."""
+    return (
+        promedio.unstack(columns)
+        .dropna(how='all')
+        .dropna(axis=1, how='all')
+        .rename(columns=str)
+    )
+
+
+def pivote_promedio(df: pd.DataFrame, index: str, columns: str) -> pd.DataFrame:
+    """Desempeño promedio (0-100) de CALIFICACION por `index` x `columns`.
+
+    Equivale a ``pivot_table(aggfunc=lambda x: np.round(x.mean() * 100, 2))``
+    pero con una sola agregación por grupos y un único redondeo al final. La
+    suma se hace en float64 aunque la columna esté guardada como float32.
+    """
+    calificacion = df['CALIFICACION'].astype('float64')
+    totales = (
+        df[[index, columns]]
+        .assign(suma=calificacion, n=calificacion.notna().astype('int64'))
+        .groupby([index, columns], observed=True)[['suma', 'n']]
+        .sum()
+    )
+    return _a_tabla(promedio_0_100(totales['suma'], totales['n']), columns)
+
+
+def porcentaje_por_grupo(frecuencias: pd.DataFrame, grupo: str = 'COMPETENCIA') -> pd.Series:
+    """Porcentaje que representa cada `frecuencia` dentro de su `grupo`."""
+    total = frecuencias.groupby(grupo, observed=True)['frecuencia'].transform('sum')
+    return 100 * frecuencias['frecuencia'] / total
+
+
+def distribucion_niveles(df: pd.DataFrame) -> pd.DataFrame:
+    """Frecuencia y porcentaje de respuestas por COMPETENCIA x NIVEL_DE_DESEMPENO."""
+    df_percent = (
+        df.groupby(['COMPETENCIA', 'NIVEL_DE_DESEMPENO'], observed=True)
+        .size()
+        .reset_index(name='frecuencia')
+    )
+    df_percent['porcentaje'] = porcentaje_por_grupo(df_percent)
+    return df_percent
+
+
+def envolver_etiquetas(serie: pd.Series) -> pd.Series:
+    """Cambia el primer '-' de cada etiqueta por un salto de línea HTML (para el eje x).
+
+    En columnas categóricas el reemplazo se hace sobre las categorías, no fila por fila.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = serie.cat.categories
+        nuevas = categorias.str.replace('-', '<br>', n=1, regex=False)
+        if nuevas.is_unique:
+            # Solo cambian los nombres de las categorías; los códigos de cada fila se conservan
+            return serie.cat.rename_categories(nuevas)
+        return serie.map(dict(zip(categorias, nuevas)))
+    return serie.str.replace('-', '<br>', n=1, regex=False)
+
+
+class CuboResultados:
+    """Cubo de agregados parciales de las calificaciones.
+
+    - ``estudiantes``: puntaje total de cada estudiante por combinación de
+      DIMENSIONES (una fila por estudiante y evaluación). Alimenta las
+      métricas y los gráficos de caja/histograma.
+    - ``celdas``: suma, conteo, suma de cuadrados y número de respuestas por
+      DIMENSIONES x COMPETENCIA x NIVEL_DE_DESEMPENO. Alimenta la tabla pivote
+      y la distribución por nivel.
+
+    Los promedios se recalculan como suma / conteo al consolidar, por lo que
+    coinciden con los que se obtendrían sobre las filas originales.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        calificacion = df['CALIFICACION'].astype('float64')
+        estudiantes = df[CLAVES_ESTUDIANTES].assign(CALIFICACION=calificacion)
+        celdas = df[CLAVES_CELDAS].assign(suma=calificacion, n=calificacion.notna().astype('int64'),
+                                          suma_cuadrados=calificacion ** 2, respuestas=1)
+        self._iniciar(estudiantes, celdas)
+
+    @classmethod
+    def combinar(cls, partes: list) -> 'CuboResultados':
+        """Cubo de la concatenación de las tablas de `partes` (p. ej. una por cohorte).
+
+        Las sumas parciales se vuelven a sumar por clave, sin leer las filas
+        originales: un estudiante que aparece en varias partes suma sus puntajes.
+        """
+        cubo = cls.__new__(cls)
+        cubo._iniciar(pd.concat(unir_categorias([parte.estudiantes for parte in partes]), ignore_index=True),
+                      pd.concat(unir_categorias([parte.celdas for parte in partes]), ignore_index=True))
+        return cubo
+
+    def _iniciar(self, estudiantes: pd.DataFrame, celdas: pd.DataFrame) -> None:
+        self.estudiantes = (
+            estudiantes
+            .groupby(CLAVES_ESTUDIANTES, observed=True, dropna=False)['CALIFICACION']
+            .sum()
+            .reset_index()
+        )
+        self.celdas = (
+            celdas
+            .groupby(CLAVES_CELDAS, observed=True, dropna=False)[['suma', 'n', 'suma_cuadrados', 'respuestas']]
+            .sum()
+            .reset_index()
+        )
+
+        self._indice_estudiantes = IndiceFiltros(self.estudiantes)
+        self._indice_celdas = IndiceFiltros(self.celdas)
+
+    # ---------------- Consultas ----------------
+    def metricas(self, filtros: dict) -> dict:
+        """Número de estudiantes y puntaje promedio de Matemáticas y Lenguaje."""
+        est = self._indice_estudiantes.filtrar(self.estudiantes, filtros)
+
+        def promedio(evaluacion):
+            sel = est[est['EVALUACION'] == evaluacion]
+            return sel['CALIFICACION'].sum() / max(sel['NUM_DOCUMENTO'].nunique(), 1)
+
+        return {
+            'estudiantes': est['NUM_DOCUMENTO'].nunique(),
+            'promedio_matematicas': promedio('MATEMATICAS'),
+            'promedio_lenguaje': promedio('LENGUAJE'),
+        }
+
+    def datos_caja(self, filtros: dict, por_evaluacion: bool = False) -> pd.DataFrame:
+        """Puntaje total por estudiante (MUNICIPIO, NUM_DOCUMENTO, GRADO[, EVALUACION])."""
+        claves = ['MUNICIPIO', 'NUM_DOCUMENTO', 'GRADO'] + (['EVALUACION'] if por_evaluacion else [])
+        est = self._indice_estudiantes.filtrar(self.estudiantes, filtros)
+        return est.groupby(claves, observed=True)['CALIFICACION'].sum().reset_index()
+
+    def pivote(self, filtros: dict) -> pd.DataFrame:
+        """Desempeño promedio (0-100) por NOMBRE IEM x COMPETENCIA."""
+        celdas = self._indice_celdas.filtrar(self.celdas, filtros)
+        totales = celdas.groupby(['NOMBRE IEM', 'COMPETENCIA'], observed=True)[['suma', 'n']].sum()
+        return _a_tabla(promedio_0_100(totales['suma'], totales['n']), 'COMPETENCIA')
+
+    def porcentajes(self, filtros: dict) -> pd.DataFrame:
+        """Frecuencia y porcentaje de respuestas por COMPETENCIA x NIVEL_DE_DESEMPENO."""
+        celdas = self._indice_celdas.filtrar(self.celdas, filtros)
+        df_percent = (
+            celdas.groupby(['COMPETENCIA', 'NIVEL_DE_DESEMPENO'], observed=True)['respuestas']
+            .sum()
+            .reset_index(name='frecuencia')
+        )
+        df_percent['porcentaje'] = porcentaje_por_grupo(df_percent)
+        return df_percent
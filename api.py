@@ -0,0 +1,268 @@
+# api.py
+# API HTTP de solo lectura con las mismas cifras de la pestaña "Resultados
+# IEMs" y de la consulta individual, para que otros sistemas no tengan que
+# cargar la página completa. Usa el mismo motor que la app (índices, cubo
+# de agregados y, si está configurado, la publicación de compartido.py).
+#
+#   GET /api/version                      versión de los datos y tamaño
+#   GET /api/opciones                     valores posibles de cada filtro
+#   GET /api/resultados?region=&iem=&grado=&evaluacion=&genero=
+#                                         métricas, pivote por competencia y niveles
+#   GET /api/estudiantes/{codigo}         resultados de un estudiante
+#
+# Cada respuesta lleva un ETag derivado de la versión de los datos y de la
+# consulta, así que un cliente que envía If-None-Match recibe 304 sin que se
+# calcule nada mientras los datos no cambien. Los cuerpos JSON ya serializados
+# se guardan en una CacheLRU del proceso. Los agregados se pueden guardar en
+# cachés compartidas (Cache-Control: public); los resultados de un estudiante
+# no (private, no-cache: el cliente revalida con el ETag).
+#
+# Ejecuta:  python api.py [--host 127.0.0.1] [--puerto 8600]
+# (starlette y uvicorn se instalan con streamlit)
+
+import argparse
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+import config
+from agregaciones import CuboResultados
+from cache import CacheLRU
+from compartido import adjuntar, version_publicada
+from consultas_sql import CuboSQL
+from exportar import resultado_estudiante
+from fuentes import FuenteDatos
+from indices import IndiceEstudiantes, IndiceFiltros, JerarquiaFiltros
+from ingesta import leer_datos
+
+# Parámetro de la consulta -> columna filtrada (los mismos filtros globales de la app)
+PARAMETROS_FILTRO = {
+    'region': 'REGION',
+    'iem': 'NOMBRE IEM',
+    'grado': 'GRADO',
+    'evaluacion': 'EVALUACION',
+    'genero': 'GENERO',
+}
+
+
+class ErrorConsulta(Exception):
+    """Consulta inválida o sin resultados; se responde con `estado` y el mensaje."""
+
+    def __init__(self, estado: int, mensaje: str):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+@dataclass
+class VersionDatos:
+    """Datos de una versión y todo lo que se construye una vez a partir de ellos."""
+    df: pd.DataFrame
+    indice_filtros: IndiceFiltros
+    indice_estudiantes: IndiceEstudiantes
+    jerarquia: JerarquiaFiltros
+    cubo: CuboResultados | CuboSQL
+
+    @property
+    def version(self) -> str:
+        return self.df.attrs['version']
+
+
+class MotorResultados:
+    """Versión vigente de los datos, con la misma procedencia que en la app.
+
+    Con config.DIR_COMPARTIDO se adjunta la versión publicada; con
+    config.DIR_DATOS se revisa la carpeta de cohortes en segundo plano; si no,
+    se lee config.ARCHIVO_DATOS una vez. Se conservan dos versiones, como en
+    los cache_resource de la app.
+    """
+
+    def __init__(self):
+        self._versiones = OrderedDict()  # version -> VersionDatos
+        self._lock = threading.Lock()
+        self._fuente = None
+        self._df = None
+        if config.DIR_COMPARTIDO:
+            return
+        if config.DIR_DATOS:
+            self._fuente = FuenteDatos(config.DIR_DATOS)
+            self._fuente.al_actualizar(self._preparar)
+            self._fuente.iniciar(config.DATOS_INTERVALO_S)
+        else:
+            self._df = leer_datos(config.ARCHIVO_DATOS)
+
+    def _construir(self, df: pd.DataFrame, indice_filtros=None, indice_estudiantes=None) -> VersionDatos:
+        def construir(clase):
+            # Con una carpeta de cohortes solo se construye lo de las cohortes que cambiaron
+            if self._fuente is not None:
+                return self._fuente.combinado(df, clase, clase.combinar)
+            return clase(df)
+
+        cubo = CuboSQL(df, motor=config.BACKEND) if config.BACKEND in ('duckdb', 'sqlite') else construir(CuboResultados)
+        return VersionDatos(df, indice_filtros or construir(IndiceFiltros),
+                            indice_estudiantes or construir(IndiceEstudiantes), construir(JerarquiaFiltros), cubo)
+
+    def _guardar(self, datos: VersionDatos) -> VersionDatos:
+        self._versiones[datos.version] = datos
+        while len(self._versiones) > 2:
+            self._versiones.popitem(last=False)
+        return datos
+
+    def _preparar(self, df: pd.DataFrame) -> None:
+        """Construye la versión nueva en el hilo de la fuente, antes de que quede vigente."""
+        datos = self._construir(df)
+        with self._lock:
+            self._guardar(datos)
+
+    def actual(self) -> VersionDatos:
+        """Versión vigente; la primera consulta de una versión nueva la construye."""
+        if config.DIR_COMPARTIDO:
+            version = version_publicada(config.DIR_COMPARTIDO)
+        else:
+            df = self._fuente.datos() if self._fuente is not None else self._df
+            version = df.attrs['version']
+        with self._lock:
+            datos = self._versiones.get(version)
+            if datos is None:
+                if config.DIR_COMPARTIDO:
+                    publicacion = adjuntar(config.DIR_COMPARTIDO, version)
+                    datos = self._construir(publicacion.df, publicacion.indice_filtros,
+                                            publicacion.indice_estudiantes)
+                else:
+                    datos = self._construir(df)
+                self._guardar(datos)
+            return datos
+
+
+# ---------------- Serialización ----------------
+def _json_por_defecto(valor):
+    # Escalares de numpy (int64, float32, ...) -> tipos de Python
+    if hasattr(valor, 'item'):
+        return valor.item()
+    return str(valor)
+
+
+def _serializar(datos) -> bytes:
+    return json.dumps(datos, ensure_ascii=False, default=_json_por_defecto).encode('utf-8')
+
+
+def _tabla(df: pd.DataFrame) -> list[dict]:
+    """Filas de la tabla como dicts; los vacíos (NaN) se envían como null."""
+    df = df.rename(columns=str)
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+# ---------------- Consultas ----------------
+def _filtros(datos: VersionDatos, parametros) -> dict:
+    """Convierte los parámetros de la URL en filtros con los valores (y tipos) de los datos."""
+    desconocidos = set(parametros) - set(PARAMETROS_FILTRO)
+    if desconocidos:
+        raise ErrorConsulta(400, f"Parámetros desconocidos: {', '.join(sorted(desconocidos))}")
+    filtros = {}
+    for parametro, valor in parametros.items():
+        col = PARAMETROS_FILTRO[parametro]
+        opciones = {str(opcion): opcion for opcion in datos.jerarquia.opciones(col)}
+        if valor not in opciones:
+            raise ErrorConsulta(404, f'{parametro}={valor} no existe en los datos')
+        filtros[col] = opciones[valor]
+    if not datos.jerarquia.existe(filtros):
+        raise ErrorConsulta(404, 'No hay resultados para la combinación de filtros seleccionada')
+    return filtros
+
+
+def resultados(datos: VersionDatos, filtros: dict) -> dict:
+    """Métricas, pivote por competencia y distribución por nivel, como en la pestaña "Resultados IEMs"."""
+    return {
+        'version': datos.version,
+        'filtros': filtros,
+        'metricas': datos.cubo.metricas(filtros),
+        'pivote': _tabla(datos.cubo.pivote(filtros).reset_index()),
+        'niveles': _tabla(datos.cubo.porcentajes(filtros)),
+    }
+
+
+def estudiante(datos: VersionDatos, codigo: str) -> dict:
+    """Resultados de un estudiante, en el formato de exportar.py."""
+    if codigo not in datos.indice_estudiantes:
+        raise ErrorConsulta(404, 'Código no encontrado')
+    return {'version': datos.version, **resultado_estudiante(datos.indice_estudiantes.filas(datos.df, codigo))}
+
+
+def opciones(datos: VersionDatos) -> dict:
+    return {'version': datos.version,
+            **{parametro: datos.jerarquia.opciones(col) for parametro, col in PARAMETROS_FILTRO.items()}}
+
+
+# ---------------- Aplicación ----------------
+def crear_app(motor: MotorResultados | None = None) -> Starlette:
+    motor = motor or MotorResultados()
+    cuerpos = CacheLRU(max_bytes=int(config.RESULTADOS_MAX_MB * 2**20), ttl=config.CACHE_TTL_S or None)
+
+    async def responder(request: Request, nombre: str, clave: tuple, calcular, privado: bool = False) -> Response:
+        """Responde 304 si el ETag del cliente coincide; si no, el JSON (de la caché o recién calculado).
+
+        El cálculo corre en el pool de hilos para no bloquear el event loop.
+        Las respuestas `privado` (datos de un estudiante) no se pueden guardar
+        en cachés compartidas (proxies, CDN) y el cliente las revalida siempre.
+        """
+        datos = await run_in_threadpool(motor.actual)
+        consulta = hashlib.sha256(repr((nombre, clave)).encode()).hexdigest()[:16]
+        etag = f'"{datos.version}-{consulta}"'
+        cache_control = 'private, no-cache' if privado else f'public, max-age={config.API_MAX_AGE_S}'
+        encabezados = {'ETag': etag, 'Cache-Control': cache_control, 'X-Datos-Version': datos.version}
+        if etag in request.headers.get('if-none-match', ''):
+            return Response(status_code=304, headers=encabezados)
+        try:
+            cuerpo = await run_in_threadpool(
+                cuerpos.obtener, (nombre, datos.version, clave), lambda: _serializar(calcular(datos)))
+        except ErrorConsulta as e:
+            return Response(_serializar({'error': str(e)}), status_code=e.estado,
+                            media_type='application/json', headers={'X-Datos-Version': datos.version})
+        return Response(cuerpo, media_type='application/json', headers=encabezados)
+
+    async def ver_version(request: Request) -> Response:
+        return await responder(request, 'version', (), lambda datos: {
+            'version': datos.version, 'filas': len(datos.df), 'estudiantes': len(datos.indice_estudiantes)})
+
+    async def ver_opciones(request: Request) -> Response:
+        return await responder(request, 'opciones', (), opciones)
+
+    async def ver_resultados(request: Request) -> Response:
+        parametros = dict(request.query_params)
+        clave = tuple(sorted(parametros.items()))
+        return await responder(request, 'resultados', clave,
+                               lambda datos: resultados(datos, _filtros(datos, parametros)))
+
+    async def ver_estudiante(request: Request) -> Response:
+        codigo = request.path_params['codigo']
+        return await responder(request, 'estudiante', (codigo,), lambda datos: estudiante(datos, codigo),
+                               privado=True)
+
+    return Starlette(routes=[
+        Route('/api/version', ver_version),
+        Route('/api/opciones', ver_opciones),
+        Route('/api/resultados', ver_resultados),
+        Route('/api/estudiantes/{codigo}', ver_estudiante),
+    ])
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='API JSON de resultados PTIES.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=config.API_PUERTO)
+    args = parser.parse_args(argv)
+    uvicorn.run(crear_app(), host=args.host, port=args.puerto, log_level='info')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,15 +2,25 @@
 # Plantilla base para apps en Streamlit (Python 3.12+)
 # Ejecuta:  streamlit run app.py
 
-import time
-from datetime import date
-import numpy as np
+import logging
+import uuid
 import pandas as pd
-import openpyxl
 #import altair as alt
 import streamlit as st
-import plotly.express as px
-import base64
+
+import config
+from ingesta import leer_datos
+from fuentes import FuenteDatos
+from compartido import Publicacion, adjuntar, version_publicada
+from indices import IndiceFiltros, IndiceEstudiantes, JerarquiaFiltros
+from agregaciones import CuboResultados, pivote_promedio, distribucion_niveles
+from consultas_sql import CuboSQL
+from reportes import AlmacenReportes
+from cache import CacheLRU, tamano_objeto
+from medicion import HistorialTiempos, TiemposEjecucion
+from activos import variante_imagen, publicar_imagen
+from graficos import (CacheFiguras, clave_filtros, figura_caja_municipios, figura_histograma_grados,
+                      figura_caja_grados, figura_niveles)
 
 # ---------------- Configuración general ----------------
 st.set_page_config(
@@ -26,23 +36,153 @@ st.set_page_config(
 )
 
 # ---------------- Función para cargar datos ----------------
-@st.cache_data(show_spinner=False)
-def load_example_data(filepath='Calificaciones_.xlsx') -> pd.DataFrame:
-    """Carga los datos desde Excel y los cachea para mejorar el rendimiento."""
-    df = pd.read_excel(filepath)
+@st.cache_resource(show_spinner=False)
+def load_example_data(filepath=config.ARCHIVO_DATOS) -> pd.DataFrame:
+    """Carga los datos desde Excel (vía snapshot Parquet) una vez por proceso.
+
+    Es un recurso compartido (sin copia por sesión, a diferencia de
+    st.cache_data), así que la app nunca debe modificar este DataFrame.
+    """
+    df = leer_datos(filepath)
     return df
 
+def construir(df: pd.DataFrame, clase):
+    """`clase(df)`; con una carpeta de cohortes, a partir de lo ya construido para
+    las cohortes que no cambiaron (ver FuenteDatos.combinado)."""
+    if config.DIR_DATOS and not config.DIR_COMPARTIDO:
+        return cargar_fuente().combinado(df, clase, clase.combinar)
+    return clase(df)
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cargar_indice_filtros(version: str, _df: pd.DataFrame) -> IndiceFiltros:
+    """Índice de filtros compartido por todas las sesiones; se reconstruye solo si cambia la versión de los datos."""
+    return construir(_df, IndiceFiltros)
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cargar_jerarquia(version: str, _df: pd.DataFrame) -> JerarquiaFiltros:
+    """Opciones de los filtros en cascada y combinaciones existentes de la versión de datos indicada."""
+    return construir(_df, JerarquiaFiltros)
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cargar_indice_estudiantes(version: str, _df: pd.DataFrame) -> IndiceEstudiantes:
+    """Índice NUM_DOCUMENTO -> filas, para la consulta individual."""
+    return construir(_df, IndiceEstudiantes)
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cargar_cubo(version: str, _df: pd.DataFrame) -> CuboResultados | CuboSQL:
+    """Agregados de la versión de datos indicada: precalculados en pandas o, según
+    config.BACKEND, consultados con SQL sobre una base DuckDB/SQLite (creada a
+    partir de `_df`, que igual se mantiene en memoria; ver consultas_sql.py)."""
+    if config.BACKEND in ('duckdb', 'sqlite'):
+        return CuboSQL(_df, motor=config.BACKEND)
+    return construir(_df, CuboResultados)
+
+def preparar_version(df: pd.DataFrame) -> None:
+    """Construye los índices y el cubo de una versión nueva antes de publicarla."""
+    version = df.attrs['version']
+    cargar_indice_filtros(version, df)
+    cargar_jerarquia(version, df)
+    cargar_cubo(version, df)
+    cargar_indice_estudiantes(version, df)
+
+@st.cache_resource(show_spinner=False)
+def cargar_fuente(directorio=config.DIR_DATOS) -> FuenteDatos:
+    """Carpeta de cohortes con ingesta incremental, revisada en segundo plano.
+
+    Las versiones nuevas se preparan en el hilo de la fuente (preparar_version),
+    así que ninguna sesión espera a que se reconstruyan los índices.
+    """
+    fuente = FuenteDatos(directorio)
+    fuente.al_actualizar(preparar_version)
+    fuente.iniciar(config.DATOS_INTERVALO_S)
+    return fuente
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def adjuntar_publicacion(version: str, directorio=config.DIR_COMPARTIDO) -> Publicacion:
+    """Datos e índices publicados por el proceso cargador, mapeados sin copia.
+
+    Se conservan dos versiones para que las sesiones que aún usan la anterior
+    no pierdan sus datos cuando se publica una nueva.
+    """
+    return adjuntar(directorio, version)
+
+@st.cache_resource(show_spinner=False)
+def cache_figuras() -> CacheFiguras:
+    """Figuras Plotly ya construidas, compartidas por todas las sesiones del proceso."""
+    return CacheFiguras(max_bytes=int(config.FIGURAS_MAX_MB * 2**20), ttl=config.CACHE_TTL_S or None)
+
+@st.cache_resource(show_spinner=False)
+def cache_resultados() -> CacheLRU:
+    """Tablas derivadas (métricas, cajas, pivotes, porcentajes) compartidas por todas las sesiones."""
+    return CacheLRU(max_bytes=int(config.RESULTADOS_MAX_MB * 2**20), ttl=config.CACHE_TTL_S or None)
+
+@st.cache_resource(show_spinner=False)
+def cargar_reportes(directorio=config.DIR_SOCIOE) -> AlmacenReportes:
+    """Índice de los PDF socioemocionales, compartido por todas las sesiones."""
+    return AlmacenReportes(directorio)
+
+@st.cache_resource(show_spinner=False)
+def cargar_imagen(ruta: str, ancho: int) -> str | bytes:
+    """Variante reducida y comprimida de la imagen, generada una vez por proceso.
+
+    Con static serving se devuelve la URL de un WebP en static/ (cacheable por
+    el navegador); si no, un PNG al ancho exacto que st.image envía sin recodificar.
+    """
+    if st.get_option('server.enableStaticServing'):
+        try:
+            return publicar_imagen(ruta, ancho)
+        except OSError as e:  # carpeta de la app de solo lectura: se envían los bytes
+            logging.getLogger(__name__).warning('No se pudo publicar %s en static/: %s', ruta, e)
+    return variante_imagen(ruta, ancho, formato='PNG')
+
+@st.cache_resource(show_spinner=False)
+def historial_tiempos() -> HistorialTiempos:
+    """Tiempos por sección de todas las sesiones; si config.ARCHIVO_TIEMPOS está definido
+    las mediciones también se agregan ahí como líneas JSON."""
+    if config.ARCHIVO_TIEMPOS:
+        manejador = logging.FileHandler(config.ARCHIVO_TIEMPOS, encoding='utf-8')
+        manejador.setFormatter(logging.Formatter('%(message)s'))
+        registro = logging.getLogger('pties.tiempos')
+        registro.addHandler(manejador)
+        registro.setLevel(logging.INFO)
+    return HistorialTiempos()
+
+def valores_presentes(serie: pd.Series) -> pd.Index:
+    """Valores de la serie ordenados por frecuencia, sin las categorías que no aparecen."""
+    conteo = serie.value_counts()
+    return conteo[conteo > 0].index
+
+# ---------------- Medición de tiempos ----------------
+# Una medición por sección en cada ejecución (ver medicion.py y el panel al final)
+historial = historial_tiempos()
+tiempos = TiemposEjecucion({'sesion': st.session_state.setdefault('sesion', uuid.uuid4().hex[:8])}, historial)
+
 # ---------------- Carga de datos ----------------
-df = load_example_data()
+with tiempos.seccion('carga') as medicion:
+    if config.DIR_COMPARTIDO:
+        publicacion = adjuntar_publicacion(version_publicada(config.DIR_COMPARTIDO))
+        df = publicacion.df
+        indice_filtros, indice_estudiantes = publicacion.indice_filtros, publicacion.indice_estudiantes
+    else:
+        df = cargar_fuente().datos() if config.DIR_DATOS else load_example_data()
+        indice_filtros = cargar_indice_filtros(df.attrs['version'], df)
+        indice_estudiantes = cargar_indice_estudiantes(df.attrs['version'], df)
+    jerarquia = cargar_jerarquia(df.attrs['version'], df)
+    cubo = cargar_cubo(df.attrs['version'], df)
+    figuras = cache_figuras()
+    resultados = cache_resultados()
+    reportes = cargar_reportes()
+    medicion.filas = len(df)
+tiempos.contexto['version'] = df.attrs['version']
 
 # ---------------- Título principal ----------------
 t1,t2 = st.columns([0.55,0.45])
 with t1:
     st.title("🧩 Calificaciones PTIES")
     col1, col2,col3 = st.columns([0.1,0.3,0.7])
-    col1.image('IMAGENES/Escudo-UdeA.png', width=150)
+    col1.image(cargar_imagen('IMAGENES/Escudo-UdeA.png', 150), width=150)
     col2.markdown("**Universidad de Antioquia**")
-t2.image('IMAGENES/PTT.png', width=600)
+t2.image(cargar_imagen('IMAGENES/PTT.png', 600), width=600)
 
 
 
@@ -53,163 +193,192 @@ st.info("📊 **Notas de las evaluaciones:** Las pruebas de **Matemáticas** y *
 tabs = st.tabs(['Resultados IEMs', 'Resultados Individuales'])
 
 # --------------------- PESTAÑA RESULTADOS IEMS ---------------------
-with tabs[0]:
+# Cada sección interactiva es un fragmento (st.fragment): al cambiar uno de
+# sus widgets solo se vuelve a ejecutar esa sección, no el script completo.
+# Las dependencias de datos se pasan explícitamente como argumentos.
+COLUMNAS_EVIDENCIAS = ['COMPETENCIA', 'COMPETENCIA_PTIES', 'EVIDENCIA']
+
+@st.fragment
+def seccion_resultados_iems():
+    """Filtros globales, métricas, gráficos y tablas; se reejecuta al cambiar un filtro."""
     st.markdown(
     "⚡ **Filtros globales:** Todos los filtros que selecciones (región, IEM, grado, género y evaluación) afectan **toda la información mostrada en los gráficos y tablas a continuación**. "
     "Esto te permite analizar de manera consistente los resultados según tus criterios de selección."
     )
     # ---------------- Filtros ----------------
-    f1, f2, f3, f4, f5 = st.columns(5)
-
-    selected_region = f1.selectbox('Región', ['Todas'] + list(df['REGION'].unique()))
-    selected_iem = f2.selectbox('IEM', ['Todas'] + list(df['NOMBRE IEM'].unique()))
-    selected_grado = f3.selectbox('Grado', ['Todos', 10, 11])
-    selected_evaluacion = f4.selectbox('Evaluación', ['Todas'] + list(df['EVALUACION'].unique()))
-    selected_genero = f5.selectbox('Género', ['Todos', 'Masculino', 'Femenino'])
-
-    # Filtrado de datos según selección
-    df_filtered = df.copy()
+    with tiempos.seccion('filtros'):
+        f1, f2, f3, f4, f5 = st.columns(5)
+
+        # Opciones en cascada: la IEM depende de la región y el grado de ambas
+        selected_region = f1.selectbox('Región', ['Todas'] + jerarquia.opciones('REGION'))
+        region = None if selected_region == 'Todas' else selected_region
+        selected_iem = f2.selectbox('IEM', ['Todas'] + jerarquia.iems(region))
+        iem = None if selected_iem == 'Todas' else selected_iem
+        selected_grado = f3.selectbox('Grado', ['Todos'] + jerarquia.grados(region, iem))
+        selected_evaluacion = f4.selectbox('Evaluación', ['Todas'] + jerarquia.opciones('EVALUACION'))
+        selected_genero = f5.selectbox('Género', ['Todos', 'Masculino', 'Femenino'])
+
+        seleccion = {
+            'NOMBRE IEM': selected_iem,
+            'REGION': selected_region,
+            'GRADO': selected_grado,
+            'GENERO': selected_genero,
+            'EVALUACION': selected_evaluacion,
+        }
+        filtros = {col: valor for col, valor in seleccion.items() if valor not in ('Todas', 'Todos')}
+    # Clave de las figuras: mismos datos y mismos filtros -> misma figura
+    clave = (df.attrs['version'], clave_filtros(filtros))
 
     materias = '(Matemáticas y Lenguaje)'
-
-    if selected_iem != 'Todas':
-        df_filtered = df_filtered[df_filtered['NOMBRE IEM'] == selected_iem]
-    if selected_region != 'Todas':
-        df_filtered = df_filtered[df_filtered['REGION'] == selected_region]
-    if selected_grado != 'Todos':
-        df_filtered = df_filtered[df_filtered['GRADO'] == selected_grado]
-    if selected_genero != 'Todos':
-        df_filtered = df_filtered[df_filtered['GENERO'] == selected_genero]
     if selected_evaluacion != 'Todas':
-        df_filtered = df_filtered[df_filtered['EVALUACION'] == selected_evaluacion]
         materias = f'({selected_evaluacion})'
 
     st.markdown("---")  # Separador visual
 
+    # Una selección sin filas se detecta en la jerarquía, antes de cualquier agregación
+    if not jerarquia.existe(filtros):
+        st.warning("⚠️ No hay resultados para la combinación de filtros seleccionada.")
+        return
+
     # ---------------- Métricas ----------------
-    m1, m2, m3 = st.columns(3)
+    with tiempos.seccion('metricas') as medicion:
+        m1, m2, m3 = st.columns(3)
 
-    filtro_mat = df_filtered['EVALUACION'] == 'MATEMATICAS'
-    filtro_len = df_filtered['EVALUACION'] == 'LENGUAJE'
+        metricas = resultados.obtener(('metricas', *clave), lambda: cubo.metricas(filtros))
+        medicion.filas = metricas['estudiantes']
 
-    m1.metric("👨‍🎓 Estudiantes", f"{df_filtered['NUM_DOCUMENTO'].nunique():,}")
-    m2.metric(
-        "📐 Puntaje promedio Matemáticas",
-        f"{df_filtered[filtro_mat]['CALIFICACION'].sum() / max(df_filtered[filtro_mat]['NUM_DOCUMENTO'].nunique(),1):.2f}"
-    )
-    m3.metric(
-        "✍️ Puntaje promedio Lenguaje",
-        f"{df_filtered[filtro_len]['CALIFICACION'].sum() / max(df_filtered[filtro_len]['NUM_DOCUMENTO'].nunique(),1):.2f}"
-    )
+        m1.metric("👨‍🎓 Estudiantes", f"{metricas['estudiantes']:,}")
+        m2.metric(
+            "📐 Puntaje promedio Matemáticas",
+            f"{metricas['promedio_matematicas']:.2f}"
+        )
+        m3.metric(
+            "✍️ Puntaje promedio Lenguaje",
+            f"{metricas['promedio_lenguaje']:.2f}"
+        )
 
     
 
     # ---------------- Gráfico de caja por IEM o municipio ----------------
     if selected_iem == 'Todas' and (selected_region == 'Todas' or selected_region == 'ANDINA'):
-        df_box = df_filtered.groupby(['MUNICIPIO', 'NUM_DOCUMENTO', 'GRADO'])['CALIFICACION'].sum().reset_index()
-        fig_box = px.box(
-            df_box, x='MUNICIPIO', y='CALIFICACION', color='MUNICIPIO', points='all',
-            title=f'Distribución de puntajes por IEM {materias}'
-        )
-        fig_box.update_layout(title_font=dict(size=20))
-        st.plotly_chart(fig_box, use_container_width=True)
+        with tiempos.seccion('caja') as medicion:
+            datos_caja = resultados.obtener(('datos_caja', *clave), lambda: cubo.datos_caja(filtros))
+            fig_box = figuras.obtener(
+                ('caja_municipios', *clave),
+                lambda: figura_caja_municipios(datos_caja, materias)
+            )
+            st.plotly_chart(fig_box, use_container_width=True)
+            medicion.filas, medicion.bytes = len(datos_caja), figuras.tamano(('caja_municipios', *clave))
         st.markdown(
             "💡 Este gráfico muestra la distribución de puntajes por municipio. "
             "Cada punto representa a un estudiante y la caja muestra la dispersión de los puntajes."
         )
 
         # ---------------- Histograma promedio por grado ----------------
-        fig_hist = px.histogram(
-            df_box, x='MUNICIPIO', y='CALIFICACION', color='GRADO', barmode='group',
-            title=f'Puntaje Promedio por IEM y Grado {materias}', histfunc='avg'
-        )
-        fig_hist.update_layout(title_font=dict(size=20))
-        st.plotly_chart(fig_hist, use_container_width=True)
+        with tiempos.seccion('histograma') as medicion:
+            fig_hist = figuras.obtener(
+                ('histograma_grados', *clave),
+                lambda: figura_histograma_grados(datos_caja, materias)
+            )
+            st.plotly_chart(fig_hist, use_container_width=True)
+            medicion.filas, medicion.bytes = len(datos_caja), figuras.tamano(('histograma_grados', *clave))
 
         st.divider()
 
         # ---------------- Tabla pivote con desempeño por competencia ----------------
-        df_pivot = df_filtered.pivot_table(
-            index='NOMBRE IEM', columns='COMPETENCIA', values='CALIFICACION',
-            aggfunc=lambda x: np.round(x.mean() * 100, 2)
-        )
+        with tiempos.seccion('pivote') as medicion:
+            df_pivot = resultados.obtener(('pivote', *clave), lambda: cubo.pivote(filtros))
 
-        st.subheader("📊 Desempeño Promedio por Competencia (0-100)")
-        st.dataframe(
-            df_pivot.style.background_gradient(cmap='RdYlGn', text_color_threshold=0.5).format("{:.2f}"),
-            use_container_width=True
-        )
+            st.subheader("📊 Desempeño Promedio por Competencia (0-100)")
+            st.dataframe(
+                df_pivot.style.background_gradient(cmap='RdYlGn', text_color_threshold=0.5).format("{:.2f}"),
+                use_container_width=True
+            )
+            medicion.filas, medicion.bytes = len(df_pivot), tamano_objeto(df_pivot)
 
     else:
         # ---------------- Caso de un IEM o municipio específico ----------------
-        df_box = df_filtered.groupby(['MUNICIPIO', 'NUM_DOCUMENTO', 'GRADO', 'EVALUACION'])['CALIFICACION'].sum().reset_index()
-        fig_box = px.box(
-            df_box, x='GRADO', y='CALIFICACION', color='EVALUACION', points='all',
-            title='Distribución de puntajes por grado'
-        )
-        fig_box.update_layout(title_font=dict(size=20))
-        st.plotly_chart(fig_box, use_container_width=True)
+        with tiempos.seccion('caja') as medicion:
+            datos_caja = resultados.obtener(('datos_caja_evaluacion', *clave),
+                                            lambda: cubo.datos_caja(filtros, por_evaluacion=True))
+            fig_box = figuras.obtener(
+                ('caja_grados', *clave),
+                lambda: figura_caja_grados(datos_caja)
+            )
+            st.plotly_chart(fig_box, use_container_width=True)
+            medicion.filas, medicion.bytes = len(datos_caja), figuras.tamano(('caja_grados', *clave))
         
         # ------------ Desempeño Promedio por Competencia ---------------
         
-        df_pivot = df_filtered.pivot_table(
-            index='NOMBRE IEM', columns='COMPETENCIA', values='CALIFICACION',
-            aggfunc=lambda x: np.round(x.mean() * 100, 2)
-        )
-        st.subheader("📊 Desempeño Promedio por Competencia (0-100)")
-        st.dataframe(df_pivot, use_container_width=True)
+        with tiempos.seccion('pivote') as medicion:
+            df_pivot = resultados.obtener(('pivote', *clave), lambda: cubo.pivote(filtros))
+            st.subheader("📊 Desempeño Promedio por Competencia (0-100)")
+            st.dataframe(df_pivot, use_container_width=True)
+            medicion.filas, medicion.bytes = len(df_pivot), tamano_objeto(df_pivot)
 
     # ---------------- Gráfico de barras apiladas ----------------
     st.subheader("📊 Distribución porcentual por Competencia y Nivel de Desempeño")
 
-    df_percent = df_filtered.groupby(['COMPETENCIA', 'NIVEL_DE_DESEMPENO']).size().reset_index(name='frecuencia')
-    df_percent['porcentaje'] = df_percent.groupby('COMPETENCIA')['frecuencia'].apply(lambda x: 100 * x / x.sum()).values
-    
-    df_percent['COMPETENCIA_WRAP'] = df_percent['COMPETENCIA'].apply(
-        lambda x: x.replace("-", "<br>", 1)  # solo primer salto; ajusta según necesites
-    )
-        
-    fig_stack = px.bar(
-        df_percent,
-        x='COMPETENCIA_WRAP',
-        y='porcentaje',
-        color='NIVEL_DE_DESEMPENO',
-        text='porcentaje',
-        category_orders={'NIVEL_DE_DESEMPENO': ['BAJO', 'MEDIO', 'ALTO']},
-        color_discrete_map={'BAJO':'#d62728', 'MEDIO':'#1f77b4', 'ALTO':'#2ca02c'}
-    )
-    fig_stack.update_traces(texttemplate='%{text:.1f}%', textposition='inside')
-    fig_stack.update_layout(yaxis=dict(title='Porcentaje', range=[0, 100]), barmode='stack')
-    st.plotly_chart(fig_stack)
+    with tiempos.seccion('niveles') as medicion:
+        df_percent = resultados.obtener(('porcentajes', *clave), lambda: cubo.porcentajes(filtros))
+        fig_stack = figuras.obtener(
+            ('niveles', *clave),
+            lambda: figura_niveles(df_percent)
+        )
+        st.plotly_chart(fig_stack)
+        medicion.filas, medicion.bytes = len(df_percent), figuras.tamano(('niveles', *clave))
 
     st.markdown(
         "💡 Este gráfico muestra la proporción de respuestas por nivel de desempeño en cada competencia. "
         "Las barras están apiladas y representan el 100% de las respuestas por competencia."
     )
     st.markdown("---")  # Separador visual
-    # ---------------- Selección de competencia para evidencias ----------------
-    st.info("Selecciona una competencia para ver información más detallada de lo que se está evaluando.")
-    selected_competencia = st.selectbox('Competencia',
-                                        ['Todas'] + list(df_filtered['COMPETENCIA'].unique()))
+    seccion_evidencias(filtros)
+
+
+@st.fragment
+def seccion_evidencias(filtros: dict):
+    """Competencias PTIES y evidencias de las filas que cumplen `filtros`.
+
+    Cambiar la competencia solo reejecuta esta sección; las métricas y los
+    gráficos de arriba no se recalculan.
+    """
+    clave = (df.attrs['version'], clave_filtros(filtros))
 
-    if selected_competencia != 'Todas':
-        df_filtered = df_filtered[df_filtered['COMPETENCIA'] == selected_competencia]
+    def filas_filtradas():
+        # Solo las columnas que usa la sección, con las filas del índice de filtros
+        return indice_filtros.filtrar(df[COLUMNAS_EVIDENCIAS], filtros)
 
-    st.subheader("📄 Competencias PTIES")
-    st.dataframe(df_filtered['COMPETENCIA_PTIES'].value_counts().index, use_container_width=True)
+    def tablas(competencia):
+        df_filtered = filas_filtradas()
+        if competencia != 'Todas':
+            df_filtered = df_filtered[df_filtered['COMPETENCIA'] == competencia]
+        return valores_presentes(df_filtered['COMPETENCIA_PTIES']), valores_presentes(df_filtered['EVIDENCIA'])
 
-    st.subheader("📄 Evidencias por Competencia")
-    st.dataframe(df_filtered['EVIDENCIA'].value_counts().index, use_container_width=True)
+    with tiempos.seccion('evidencias') as medicion:
+        # ---------------- Selección de competencia para evidencias ----------------
+        st.info("Selecciona una competencia para ver información más detallada de lo que se está evaluando.")
+        competencias = resultados.obtener(('competencias', *clave),
+                                          lambda: list(filas_filtradas()['COMPETENCIA'].unique()))
+        selected_competencia = st.selectbox('Competencia', ['Todas'] + competencias)
 
+        competencias_pties, evidencias = resultados.obtener(('evidencias', *clave, selected_competencia),
+                                                            lambda: tablas(selected_competencia))
 
+        st.subheader("📄 Competencias PTIES")
+        st.dataframe(competencias_pties, use_container_width=True)
+
+        st.subheader("📄 Evidencias por Competencia")
+        st.dataframe(evidencias, use_container_width=True)
+        medicion.filas = len(competencias_pties) + len(evidencias)
+        medicion.bytes = tamano_objeto(competencias_pties) + tamano_objeto(evidencias)
+
+@st.fragment
+@tiempos.medida('socioe')
+def seccion_socioe():
+    """Descarga de los PDF socioemocionales; no depende de los filtros globales."""
     ###### PDFs SOCIOE  ###########
     st.markdown("---")  # Separador visual
-    # Función para cargar el PDF
-    def load_pdf(pdf_file):
-        with open(pdf_file, "rb") as f:
-            pdf_data = f.read()
-        return pdf_data
-    
     #st.markdown("## 💫 Expectativas, Intereses y Competencias Socioemocionales")
     st.markdown(
     """
@@ -221,20 +390,19 @@ with tabs[0]:
     unsafe_allow_html=True
 )
 
-    sel_municipio = st.selectbox('Municipios', ['Selección'] + list(set(df['MUNICIPIO'].unique())-{'TIBU','ANORI'}))
+    sel_municipio = st.selectbox('Municipios', ['Selección'] + reportes.municipios())
     if sel_municipio =='Selección':
         pass
     else:
-        with open(f'SOCIOE/{sel_municipio}.pdf', "rb") as f:
-            pdf_bytes = f.read()
-            st.download_button(label="Abrir PDF",
-                               data=pdf_bytes,
-                               file_name=f"{sel_municipio}.pdf",
-                               mime="application/pdf")
+        # Los bytes solo se entregan cuando se hace clic (y se leen del disco una vez por proceso)
+        st.download_button(label="Abrir PDF",
+                           data=lambda: reportes.contenido(sel_municipio),
+                           file_name=f"{sel_municipio}.pdf",
+                           mime="application/pdf")
 
 
         # Cargar el PDF desde un archivo
-        #pdf_data = load_pdf(f'SOCIOE/{sel_municipio}.pdf')
+        #pdf_data = reportes.contenido(sel_municipio)
         
         #pdf_base64 = base64.b64encode(pdf_data).decode()
         
@@ -243,17 +411,24 @@ with tabs[0]:
         #st.markdown(href, unsafe_allow_html=True)
 
 
+with tabs[0]:
+    seccion_resultados_iems()
+    seccion_socioe()
+
 
 # --------------------- PESTAÑA RESULTADOS INDIVIDUALES ---------------------
-with tabs[1]:
+@st.fragment
+@tiempos.medida('individual')
+def pestana_individual():
+    """Consulta por código de estudiante; solo usa el índice de estudiantes."""
     st.header("👤 Resultados Individuales")
     st.markdown(
         "Esta sección mostrará los resultados detallados de cada estudiante. "
     )
     selected_cod = st.text_input("Ingrese el código asociado al estudiante:")
 
-    if selected_cod in df['NUM_DOCUMENTO'].unique():
-        df_cod = df[df['NUM_DOCUMENTO']==selected_cod].copy()
+    if selected_cod in indice_estudiantes:
+        df_cod = indice_estudiantes.filas(df, selected_cod)
 
         r1, r2, r3 = st.columns(3) 
 
@@ -273,10 +448,7 @@ with tabs[1]:
 
         # ------------ Desempeño Promedio por Competencia ---------------
         
-        df_pivot = df_cod.pivot_table(
-            index='COMPETENCIA', columns='NUM_DOCUMENTO', values='CALIFICACION',
-            aggfunc=lambda x: np.round(x.mean() * 100, 2)
-        )
+        df_pivot = pivote_promedio(df_cod, index='COMPETENCIA', columns='NUM_DOCUMENTO')
         st.subheader("📊 Desempeño Promedio por Competencia (0-100)")
         st.dataframe(df_pivot, use_container_width=True)
 
@@ -284,24 +456,10 @@ with tabs[1]:
         # ---------------- Gráfico de barras apiladas ----------------
         st.subheader("📊 Distribución porcentual por Competencia y Nivel de Desempeño")
 
-        df_percent = df_cod.groupby(['COMPETENCIA', 'NIVEL_DE_DESEMPENO']).size().reset_index(name='frecuencia')
-        df_percent['porcentaje'] = df_percent.groupby('COMPETENCIA')['frecuencia'].apply(lambda x: 100 * x / x.sum()).values
-
-        df_percent['COMPETENCIA_WRAP'] = df_percent['COMPETENCIA'].apply(
-        lambda x: x.replace("-", "<br>", 1)  # solo primer salto; ajusta según necesites
+        fig_stack = figuras.obtener(
+            ('niveles_estudiante', df.attrs['version'], selected_cod),
+            lambda: figura_niveles(distribucion_niveles(df_cod))
         )
-        
-        fig_stack = px.bar(
-            df_percent,
-            x='COMPETENCIA_WRAP',
-            y='porcentaje',
-            color='NIVEL_DE_DESEMPENO',
-            text='porcentaje',
-            category_orders={'NIVEL_DE_DESEMPENO': ['BAJO', 'MEDIO', 'ALTO']},
-            color_discrete_map={'BAJO':'#d62728', 'MEDIO':'#1f77b4', 'ALTO':'#2ca02c'}
-        )
-        fig_stack.update_traces(texttemplate='%{text:.1f}%', textposition='inside')
-        fig_stack.update_layout(yaxis=dict(title='Porcentaje', range=[0, 100]), barmode='stack')
         st.plotly_chart(fig_stack)
 
         st.markdown(
@@ -319,15 +477,40 @@ with tabs[1]:
             df_cod = df_cod[df_cod['COMPETENCIA'] == selected_competencia_IND]
 
         st.subheader("📄 Competencias PTIES")
-        st.dataframe(df_cod['COMPETENCIA_PTIES'].value_counts().index, use_container_width=True)
+        st.dataframe(valores_presentes(df_cod['COMPETENCIA_PTIES']), use_container_width=True)
 
         st.subheader("📄 Evidencias por Competencia")
-        st.dataframe(df_cod['EVIDENCIA'].value_counts().index, use_container_width=True)
+        st.dataframe(valores_presentes(df_cod['EVIDENCIA']), use_container_width=True)
 
     elif selected_cod:
         st.markdown("⚠️ ¡Código no encontrado!")
 
 
+with tabs[1]:
+    pestana_individual()
+
+
+# ---------------- Panel de tiempos (administración) ----------------
+# Se actualiza en cada ejecución completa; las secciones que se reejecutan
+# solas (fragmentos) quedan en el log y en el historial del proceso.
+if config.PANEL_ADMIN:
+    with st.sidebar:
+        st.subheader("⏱️ Tiempos por sección")
+        st.caption(f"Última ejecución: {tiempos.total_ms():.1f} ms · datos {df.attrs['version']}")
+        st.dataframe(tiempos.tabla().round(1), use_container_width=True)
+        st.caption("Todas las sesiones del proceso (ms)")
+        st.dataframe(historial.resumen().round(1), use_container_width=True)
+        st.caption("Cachés compartidas")
+        st.dataframe(
+            pd.DataFrame({'resultados': resultados.estadisticas(), 'figuras': figuras.estadisticas()}).round(3),
+            use_container_width=True
+        )
+        # Reporte del esquema compacto (ingesta.aplicar_esquema), guardado con el snapshot
+        memoria = df.attrs.get('memoria_mb') or {}
+        if memoria.get('despues') is not None:
+            antes = f"{memoria['antes']:.1f} MB → " if memoria.get('antes') is not None else ''
+            st.caption(f"Memoria de los datos: {antes}{memoria['despues']:.1f} MB")
+
 
 
 
@@ -0,0 +1,86 @@
+# benchmarks/bench_agregaciones.py
+# Micro-benchmark de los núcleos de agregaciones.py frente a las lambdas que
+# usaba app.py. Verifica que los resultados sean idénticos y mide el tiempo.
+# Ejecuta:  python benchmarks/bench_agregaciones.py [filas ...]
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agregaciones import pivote_promedio, distribucion_niveles, envolver_etiquetas  # noqa: E402
+from ingesta import aplicar_esquema  # noqa: E402
+from sinteticos import libro_sintetico  # noqa: E402
+
+
+def datos_sinteticos(filas: int, semilla: int = 0) -> pd.DataFrame:
+    """Columnas usadas aquí de un libro sintético, como texto sin compactar (así las recibía app.py)."""
+    columnas = ['NOMBRE IEM', 'COMPETENCIA', 'NIVEL_DE_DESEMPENO', 'CALIFICACION']
+    return libro_sintetico(filas, semilla)[columnas].astype(object).astype({'CALIFICACION': 'float64'})
+
+
+# ---------------- Versiones anteriores (con lambdas) ----------------
+def pivote_lambda(df):
+    return df.pivot_table(
+        index='NOMBRE IEM', columns='COMPETENCIA', values='CALIFICACION',
+        aggfunc=lambda x: np.round(x.mean() * 100, 2)
+    )
+
+
+def niveles_lambda(df):
+    df_percent = df.groupby(['COMPETENCIA', 'NIVEL_DE_DESEMPENO']).size().reset_index(name='frecuencia')
+    df_percent['porcentaje'] = df_percent.groupby('COMPETENCIA')['frecuencia'].apply(lambda x: 100 * x / x.sum()).values
+    return df_percent
+
+
+def etiquetas_lambda(df):
+    return df['COMPETENCIA'].apply(lambda x: x.replace("-", "<br>", 1))
+
+
+def cronometrar(funcion, *args, repeticiones: int = 5) -> float:
+    """Mejor tiempo (ms) de varias repeticiones."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos) * 1000
+
+
+def main(tamanos):
+    # Ambas versiones corren sobre el mismo DataFrame, así que la aceleración
+    # mide solo el cambio de núcleo; se repite con columnas de texto (como las
+    # recibía app.py) y con el esquema compacto de ingesta.py
+    print(f"{'filas':>10} {'columnas':<11} {'operación':<12} {'lambda (ms)':>12} {'vector (ms)':>12} {'aceleración':>12}")
+    for filas in tamanos:
+        original = datos_sinteticos(filas)
+        compacto = aplicar_esquema(original)
+
+        pd.testing.assert_frame_equal(
+            pivote_lambda(original), pivote_promedio(compacto, 'NOMBRE IEM', 'COMPETENCIA'),
+            check_names=False, check_index_type=False, check_column_type=False, check_categorical=False,
+        )
+        pd.testing.assert_frame_equal(
+            niveles_lambda(original), distribucion_niveles(compacto).astype(niveles_lambda(original).dtypes),
+        )
+        assert etiquetas_lambda(original).tolist() == envolver_etiquetas(compacto['COMPETENCIA']).astype(str).tolist()
+
+        casos = [
+            ('pivote', pivote_lambda, lambda d: pivote_promedio(d, 'NOMBRE IEM', 'COMPETENCIA')),
+            ('niveles', niveles_lambda, distribucion_niveles),
+            ('etiquetas', etiquetas_lambda, lambda d: envolver_etiquetas(d['COMPETENCIA'])),
+        ]
+        for columnas, datos in (('texto', original), ('categorías', compacto)):
+            for nombre, antes, despues in casos:
+                t_antes = cronometrar(antes, datos)
+                t_despues = cronometrar(despues, datos)
+                print(f'{filas:>10,} {columnas:<11} {nombre:<12} {t_antes:>12.2f} {t_despues:>12.2f} '
+                      f'{t_antes / t_despues:>11.1f}x')
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
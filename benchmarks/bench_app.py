@@ -0,0 +1,176 @@
+# benchmarks/bench_app.py
+# Benchmark de la app completa con streamlit.testing (AppTest) sobre libros
+# sintéticos (ver sinteticos.py). Para cada tamaño mide:
+#   - la carga en frío (conversión a Parquet, índices y cubo) y en caliente;
+#   - cada combinación de filtros, la primera vez (agregaciones y figuras
+#     construidas) y la segunda (desde las cachés compartidas);
+#   - la selección de competencia, el informe SOCIOE y la consulta individual;
+# y desglosa cada ejecución por sección con las mediciones de medicion.py.
+#
+# Ejecuta:  python benchmarks/bench_app.py [--filas 10000 100000 ...] [--json resultados.json]
+# Cada tamaño corre en un proceso aparte (config.py lee el entorno al importarse).
+# Respeta PTIES_BACKEND y las demás variables de config.py.
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ))
+
+ETIQUETA_CODIGO = 'Ingrese el código asociado al estudiante:'
+FILTROS = ('Región', 'IEM', 'Grado', 'Evaluación', 'Género')
+
+
+class _Recolector(logging.Handler):
+    """Guarda las mediciones que medicion.py emite en el logger pties.tiempos."""
+
+    def __init__(self):
+        super().__init__()
+        self.registros = []
+
+    def emit(self, record):
+        self.registros.append(json.loads(record.getMessage()))
+
+
+def _combinaciones(df: pd.DataFrame) -> list[dict]:
+    """Sin filtros, cada valor de cada filtro por separado y algunos pares."""
+    valores = {
+        'Región': df['REGION'].unique().tolist(),
+        'IEM': df['NOMBRE IEM'].unique().tolist()[:3],
+        'Grado': [10, 11],
+        'Evaluación': df['EVALUACION'].unique().tolist(),
+        'Género': ['Masculino', 'Femenino'],
+    }
+    combos = [{}] + [{filtro: v} for filtro, lista in valores.items() for v in lista]
+    combos += [{'Región': r, 'Evaluación': e} for r in valores['Región'][:2] for e in valores['Evaluación']]
+    combos += [{'IEM': valores['IEM'][0], 'Grado': 10, 'Género': 'Femenino'}]
+    return combos
+
+
+def _ejecutar(datos: str) -> dict:
+    """Corre todas las interacciones sobre `datos` en este proceso y devuelve las mediciones."""
+    from streamlit.testing.v1 import AppTest
+
+    recolector = _Recolector()
+    registro = logging.getLogger('pties.tiempos')
+    registro.addHandler(recolector)
+    registro.setLevel(logging.INFO)
+    registro.propagate = False
+
+    pasos = []
+
+    def paso(nombre, accion):
+        desde = len(recolector.registros)
+        inicio = time.perf_counter()
+        at = accion()
+        total = (time.perf_counter() - inicio) * 1000
+        if at.exception:
+            raise RuntimeError(f'{nombre}: {at.exception[0].message}')
+        secciones = {r['seccion']: r['ms'] for r in recolector.registros[desde:]}
+        pasos.append({'paso': nombre, 'total_ms': total, **secciones})
+        return at
+
+    def nueva():
+        return AppTest.from_file(str(RAIZ / 'app.py'), default_timeout=600)
+
+    at = paso('carga en frío', lambda: nueva().run())
+    at = paso('carga en caliente', lambda: nueva().run())
+
+    from ingesta import leer_datos
+    df = leer_datos(datos)
+
+    def seleccionar(at, etiqueta, valor):
+        return next(s for s in at.selectbox if s.label == etiqueta).set_value(valor)
+
+    def valores(combo):
+        return {filtro: combo.get(filtro, 'Todos' if filtro in ('Grado', 'Género') else 'Todas') for filtro in FILTROS}
+
+    def aplicar(at, combo):
+        for filtro, valor in valores(combo).items():
+            seleccionar(at, filtro, valor)
+        at = at.run()
+        actuales = {s.label: s.value for s in at.selectbox if s.label in FILTROS}
+        if actuales != valores(combo):
+            raise RuntimeError(f'Filtros aplicados {actuales}, esperados {valores(combo)}')
+        return at
+
+    def reiniciar(at):
+        # Las opciones de IEM y Grado dependen de la región (y la IEM): desde
+        # "sin filtros" todas están disponibles, así que cada combinación se
+        # aplica en una sola ejecución. El reinicio no se mide.
+        if all(s.value in ('Todas', 'Todos') for s in at.selectbox if s.label in FILTROS):
+            return at
+        return aplicar(at, {})
+
+    for ronda in ('filtros (frío)', 'filtros (caliente)'):
+        for combo in _combinaciones(df):
+            nombre = f"{ronda} {', '.join(f'{k}={v}' for k, v in combo.items()) or 'sin filtros'}"
+            at = reiniciar(at)
+            at = paso(nombre, lambda: aplicar(at, combo))
+    at = paso('sin filtros', lambda: aplicar(at, {}))
+
+    competencia = df['COMPETENCIA'].iloc[0]
+    at = paso('competencia', lambda: seleccionar(at, 'Competencia', competencia).run())
+    municipios = next(s for s in at.selectbox if s.label == 'Municipios').options
+    if len(municipios) > 1:
+        at = paso('socioe', lambda: seleccionar(at, 'Municipios', municipios[1]).run())
+    codigo = str(df['NUM_DOCUMENTO'].iloc[len(df) // 2])
+    at = paso('consulta individual', lambda: next(t for t in at.text_input if t.label == ETIQUETA_CODIGO)
+              .input(codigo).run())
+    return {'filas': len(df), 'pasos': pasos}
+
+
+def _resumen(resultado: dict) -> None:
+    pasos = pd.DataFrame(resultado['pasos']).set_index('paso')
+    print(f"\n==== {resultado['filas']:,} filas ====")
+    with pd.option_context('display.max_rows', None, 'display.width', 200, 'display.max_columns', None):
+        print(pasos.round(1).fillna('').to_string())
+        filtros = pasos[pasos.index.str.startswith('filtros')]
+        ronda = filtros.index.str.extract(r'\((\w+)\)', expand=False)
+        print('\nFiltros, mediana por sección (ms):')
+        print(filtros.groupby(ronda.values).median(numeric_only=True).round(1).to_string())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark de la app con AppTest sobre datos sintéticos.')
+    parser.add_argument('--filas', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--json', help='Guarda todas las mediciones en este archivo')
+    parser.add_argument('--ejecutar', help=argparse.SUPPRESS)  # uso interno: un tamaño en este proceso
+    args = parser.parse_args(argv)
+
+    if args.ejecutar:
+        os.chdir(RAIZ)  # imágenes y SOCIOE se buscan con rutas relativas
+        print(json.dumps(_ejecutar(args.ejecutar)))
+        return
+
+    from sinteticos import escribir, libro_sintetico
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for filas in args.filas:
+            datos = escribir(libro_sintetico(filas), Path(tmp) / f'sintetico-{filas}.csv')
+            entorno = {**os.environ, 'PTIES_DATOS': str(datos), 'PTIES_DIR_DATOS': '',
+                       'PTIES_CACHE': str(Path(tmp) / f'cache-{filas}'), 'STREAMLIT_LOGGER_LEVEL': 'error'}
+            salida = subprocess.run([sys.executable, __file__, '--ejecutar', str(datos)],
+                                    env=entorno, capture_output=True, text=True)
+            if salida.returncode:
+                sys.exit(salida.stderr)
+            resultado = json.loads(salida.stdout.strip().splitlines()[-1])
+            _resumen(resultado)
+            resultados.append(resultado)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(resultados, indent=1))
+
+
+if __name__ == '__main__':
+    main()
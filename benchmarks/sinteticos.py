@@ -0,0 +1,119 @@
+# benchmarks/sinteticos.py
+# Generador de libros de calificaciones sintéticos con el mismo esquema que
+# Calificaciones_.xlsx, para probar y medir la app sin los datos reales.
+# Todo se arma con numpy (sin bucles por fila), así que 10M de filas toman
+# segundos; el costo está en escribir el archivo.
+#
+# Ejecuta:  python benchmarks/sinteticos.py FILAS salida.(csv|xlsx|parquet) [--semilla N]
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Región -> municipios (nombres ficticios, con la misma jerarquía que los datos reales)
+MUNICIPIOS = {
+    'ANDINA': ['ABEJORRAL', 'ANORI', 'VIOTA', 'SONSON', 'URRAO', 'ANDES'],
+    'PACIFICA': ['BARBACOAS', 'RIOSUCIO', 'TUMACO', 'GUAPI'],
+    'ORIENTAL': ['ACEVEDO', 'CONVENCION', 'TIBU', 'RIOBLANCO', 'ARAUQUITA'],
+    'CARIBE': ['ARACATACA', 'FUNDACION', 'SAN JACINTO', 'EL CARMEN'],
+}
+COMPETENCIAS = {
+    'MATEMATICAS': ['RESOLUCION-DE PROBLEMAS', 'RAZONAMIENTO-Y ARGUMENTACION', 'COMUNICACION-MATEMATICA'],
+    'LENGUAJE': ['LECTURA-LITERAL', 'LECTURA-INFERENCIAL', 'LECTURA-CRITICA'],
+}
+COLUMNAS = ['REGION', 'NOMBRE IEM', 'MUNICIPIO', 'GRADO', 'GENERO', 'EVALUACION', 'COMPETENCIA',
+            'COMPETENCIA_PTIES', 'EVIDENCIA', 'NIVEL_DE_DESEMPENO', 'CALIFICACION', 'NUM_DOCUMENTO']
+MAX_FILAS_EXCEL = 1_048_575
+
+
+def libro_sintetico(filas: int, semilla: int = 0, preguntas: int = 30, iems_por_municipio: int = 3) -> pd.DataFrame:
+    """Libro con ~`filas` respuestas: `preguntas` por evaluación y estudiante (2 evaluaciones).
+
+    Cada estudiante tiene una habilidad propia y cada IEM un efecto, de modo
+    que los puntajes varían entre estudiantes e instituciones como en los
+    datos reales; el nivel de desempeño depende de la respuesta y la habilidad.
+    """
+    rng = np.random.default_rng(semilla)
+    por_estudiante = 2 * preguntas
+    n_est = max(1, filas // por_estudiante)
+
+    # ---------------- Estudiantes ----------------
+    municipios = [(region, municipio) for region, lista in MUNICIPIOS.items() for municipio in lista]
+    iems = [(region, municipio, f'IEM {municipio} {k + 1}')
+            for region, municipio in municipios for k in range(iems_por_municipio)]
+    iem = rng.integers(0, len(iems), n_est)
+    tabla_iems = np.array(iems, dtype=object)
+    habilidad = rng.normal(0, 1, n_est) + rng.normal(0, 0.5, len(iems))[iem]
+    grado = rng.choice(np.array([10, 11], dtype='int8'), n_est)
+    genero = rng.choice(np.array(['Masculino', 'Femenino'], dtype=object), n_est)
+    documento = np.array([f'S{i:08d}' for i in range(n_est)], dtype=object)
+
+    # ---------------- Preguntas ----------------
+    evaluaciones = np.repeat(np.array(list(COMPETENCIAS), dtype=object), preguntas)
+    competencia = np.array([COMPETENCIAS[ev][q % 3] for ev in COMPETENCIAS for q in range(preguntas)], dtype=object)
+    pties = np.array([f'{c} PTIES {q % 2 + 1}' for c, q in zip(competencia, range(por_estudiante))], dtype=object)
+    evidencia = np.array([f'EVIDENCIA {c} {q % 4 + 1}' for c, q in zip(competencia, range(por_estudiante))],
+                         dtype=object)
+    dificultad = rng.normal(0, 0.8, por_estudiante)
+
+    # ---------------- Respuestas (estudiante x pregunta) ----------------
+    est = np.repeat(np.arange(n_est), por_estudiante)
+    pregunta = np.tile(np.arange(por_estudiante), n_est)
+    probabilidad = 1 / (1 + np.exp(-(habilidad[est] - dificultad[pregunta] + 0.2)))
+    calificacion = (rng.random(len(est)) < probabilidad).astype('float64')
+    nivel = np.where(calificacion == 0, 'BAJO', np.where(habilidad[est] > 0.5, 'ALTO', 'MEDIO')).astype(object)
+
+    return pd.DataFrame({
+        'REGION': tabla_iems[iem[est], 0],
+        'NOMBRE IEM': tabla_iems[iem[est], 2],
+        'MUNICIPIO': tabla_iems[iem[est], 1],
+        'GRADO': grado[est],
+        'GENERO': genero[est],
+        'EVALUACION': evaluaciones[pregunta],
+        'COMPETENCIA': competencia[pregunta],
+        'COMPETENCIA_PTIES': pties[pregunta],
+        'EVIDENCIA': evidencia[pregunta],
+        'NIVEL_DE_DESEMPENO': nivel,
+        'CALIFICACION': calificacion,
+        'NUM_DOCUMENTO': documento[est],
+    }, columns=COLUMNAS)
+
+
+def escribir(df: pd.DataFrame, destino) -> Path:
+    """Escribe el libro en el formato que indica la extensión (.csv, .xlsx o .parquet)."""
+    destino = Path(destino)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    extension = destino.suffix.lower()
+    if extension == '.csv':
+        df.to_csv(destino, index=False)
+    elif extension == '.xlsx':
+        if len(df) > MAX_FILAS_EXCEL:
+            raise ValueError(f'Excel admite hasta {MAX_FILAS_EXCEL:,} filas; use .csv o .parquet')
+        df.to_excel(destino, index=False)
+    elif extension == '.parquet':
+        df.to_parquet(destino, index=False)
+    else:
+        raise ValueError(f'Extensión no soportada: {destino.suffix}')
+    return destino
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Genera un libro de calificaciones sintético.')
+    parser.add_argument('filas', type=int)
+    parser.add_argument('salida')
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    df = libro_sintetico(args.filas, args.semilla)
+    generado = time.perf_counter() - inicio
+    escribir(df, args.salida)
+    print(f'{len(df):,} filas ({df["NUM_DOCUMENTO"].nunique():,} estudiantes) -> {args.salida} '
+          f'(generación {generado:.1f} s, total {time.perf_counter() - inicio:.1f} s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# cache.py
+# Caché LRU en memoria compartida por todas las sesiones de un proceso.
+# Guarda resultados derivados (tablas agregadas, figuras) por clave; las
+# claves deben incluir la versión de los datos y los filtros normalizados.
+# Los objetos se entregan sin copiar: quien los recibe no debe modificarlos.
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def tamano_objeto(objeto) -> int:
+    """Bytes aproximados que ocupa un resultado (DataFrame, Series, dict, tupla o escalar)."""
+    if isinstance(objeto, pd.DataFrame):
+        return int(objeto.memory_usage(deep=True).sum())
+    if isinstance(objeto, (pd.Series, pd.Index)):
+        return int(objeto.memory_usage(deep=True))
+    if isinstance(objeto, dict):
+        return sys.getsizeof(objeto) + sum(tamano_objeto(v) for v in objeto.values())
+    if isinstance(objeto, (tuple, list)):
+        return sys.getsizeof(objeto) + sum(tamano_objeto(v) for v in objeto)
+    return sys.getsizeof(objeto)
+
+
+class CacheLRU:
+    """Caché LRU limitada por memoria (`max_bytes`) y, opcionalmente, por antigüedad (`ttl` en segundos).
+
+    Lleva contadores de aciertos, fallos, desalojos y expiraciones, que se
+    consultan con ``estadisticas()``. Es segura entre hilos; si dos sesiones
+    piden a la vez una clave ausente, ambas la calculan y se guarda una.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float | None = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entradas = OrderedDict()  # clave -> (valor, bytes, instante)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = self.fallos = self.desalojos = self.expirados = 0
+
+    def _tamano(self, valor) -> int:
+        return tamano_objeto(valor)
+
+    def _vigente(self, instante: float, ahora: float) -> bool:
+        return self.ttl is None or ahora - instante <= self.ttl
+
+    def obtener(self, clave, construir):
+        """Devuelve el valor de `clave`, calculándolo con `construir()` si no está o expiró."""
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                if self._vigente(entrada[2], ahora):
+                    self._entradas.move_to_end(clave)
+                    self.aciertos += 1
+                    return entrada[0]
+                self._quitar(clave)
+                self.expirados += 1
+            self.fallos += 1
+
+        valor = construir()
+        tamano = self._tamano(valor)
+        self.purgar_expirados()
+        with self._lock:
+            if clave not in self._entradas:
+                self._entradas[clave] = (valor, tamano, time.monotonic())
+                self._bytes += tamano
+            # Se descartan las menos usadas recientemente hasta caber en el presupuesto
+            while self._bytes > self.max_bytes and len(self._entradas) > 1:
+                self._quitar(next(iter(self._entradas)))
+                self.desalojos += 1
+        return valor
+
+    def tamano(self, clave) -> int | None:
+        """Bytes registrados para `clave` (None si no está en la caché)."""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            return None if entrada is None else entrada[1]
+
+    def _quitar(self, clave) -> None:
+        _, tamano, _ = self._entradas.pop(clave)
+        self._bytes -= tamano
+
+    def purgar_expirados(self) -> int:
+        """Elimina las entradas vencidas por TTL; devuelve cuántas se quitaron."""
+        if self.ttl is None:
+            return 0
+        ahora = time.monotonic()
+        with self._lock:
+            vencidas = [c for c, (_, _, t) in self._entradas.items() if not self._vigente(t, ahora)]
+            for clave in vencidas:
+                self._quitar(clave)
+            self.expirados += len(vencidas)
+        return len(vencidas)
+
+    def estadisticas(self) -> dict:
+        """Entradas, memoria usada y contadores de uso de la caché."""
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._entradas),
+                'mb': self._bytes / 2**20,
+                'max_mb': self.max_bytes / 2**20,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+                'desalojos': self.desalojos,
+                'expirados': self.expirados,
+            }
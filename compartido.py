@@ -0,0 +1,169 @@
+# compartido.py
+# Modo multi-proceso: un proceso cargador publica los datos y sus índices una
+# sola vez en una carpeta (idealmente en memoria, p. ej. /dev/shm/pties) y
+# cada worker de Streamlit los mapea con mmap en lugar de tener su propia copia.
+#
+#   <carpeta>/<version>/datos.arrow         tabla en formato Arrow IPC sin compresión
+#   <carpeta>/<version>/indices.json        valores de cada índice y metadata
+#   <carpeta>/<version>/<indice>-*.npy      posiciones de fila de cada índice
+#   <carpeta>/actual.json                   sello con la versión vigente
+#
+# Los workers leen el sello en cada ejecución; cuando cambia, adjuntan la
+# versión nueva y las sesiones siguientes la usan. Las carpetas de versión
+# nunca se modifican: se escriben completas con otro nombre y se renombran.
+#
+# Despliegue (un worker por núcleo detrás de un balanceador local):
+#   python compartido.py --destino /dev/shm/pties [--datos carpeta_o_libro] [--intervalo 60]
+#   PTIES_COMPARTIDO=/dev/shm/pties streamlit run app.py --server.port 8501
+#   PTIES_COMPARTIDO=/dev/shm/pties streamlit run app.py --server.port 8502 ...
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import config
+from indices import IndiceEstudiantes, IndiceFiltros
+from ingesta import escribir_atomico, leer_datos
+
+log = logging.getLogger(__name__)
+
+SELLO = 'actual.json'
+# Versiones que se conservan en la carpeta (la vigente y la anterior, que
+# puede seguir mapeada por workers que aún no cambiaron)
+VERSIONES_CONSERVADAS = 2
+
+
+@dataclass
+class Publicacion:
+    """Datos e índices de una versión publicada, mapeados desde la carpeta compartida."""
+    version: str
+    df: pd.DataFrame
+    indice_filtros: IndiceFiltros
+    indice_estudiantes: IndiceEstudiantes
+
+
+def _nombre(columna: str) -> str:
+    return columna.replace(' ', '_')
+
+
+def _escribir_json(destino: Path, datos) -> None:
+    escribir_atomico(destino, lambda tmp: tmp.write_text(json.dumps(datos, ensure_ascii=False)))
+
+
+# ---------------- Publicación (proceso cargador) ----------------
+def publicar(df: pd.DataFrame, destino, indice_filtros: IndiceFiltros | None = None,
+             indice_estudiantes: IndiceEstudiantes | None = None) -> Path:
+    """Escribe la versión de `df` (y sus índices) en `destino` y la marca como vigente."""
+    destino = Path(destino)
+    version = df.attrs['version']
+    carpeta = destino / version
+    if not carpeta.exists():
+        indice_filtros = indice_filtros or IndiceFiltros(df)
+        indice_estudiantes = indice_estudiantes or IndiceEstudiantes(df)
+        tmp = destino / f'.{version}.{os.getpid()}.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.OSFile(str(tmp / 'datos.arrow'), 'wb') as archivo:
+            with pa.ipc.new_file(archivo, tabla.schema) as escritor:
+                escritor.write_table(tabla)
+
+        grupos = {**{f'filtro-{_nombre(col)}': grupo for col, grupo in indice_filtros.grupos.items()},
+                  'estudiantes': indice_estudiantes.grupo}
+        for nombre, (orden, _, limites) in grupos.items():
+            np.save(tmp / f'{nombre}-orden.npy', np.ascontiguousarray(orden))
+            np.save(tmp / f'{nombre}-limites.npy', np.ascontiguousarray(limites))
+        _escribir_json(tmp / 'indices.json', {
+            'version': version,
+            'n_filas': len(df),
+            'memoria_mb': df.attrs.get('memoria_mb'),
+            'filtros': {col: f'filtro-{_nombre(col)}' for col in indice_filtros.grupos},
+            'valores': {nombre: list(valores) for nombre, (_, valores, _) in grupos.items()},
+        })
+        os.replace(tmp, carpeta)
+
+    _escribir_json(destino / SELLO, {'version': version, 'publicado': time.time()})
+    log.info('Versión %s publicada en %s', version, destino)
+    _limpiar(destino, version)
+    return carpeta
+
+
+def _limpiar(destino: Path, vigente: str) -> None:
+    """Borra las versiones viejas; los workers que aún las tengan mapeadas siguen funcionando."""
+    versiones = sorted((p for p in destino.iterdir() if p.is_dir() and not p.name.startswith('.')),
+                       key=lambda p: p.stat().st_mtime, reverse=True)
+    for carpeta in versiones[VERSIONES_CONSERVADAS:]:
+        if carpeta.name != vigente:
+            shutil.rmtree(carpeta, ignore_errors=True)
+
+
+# ---------------- Adjuntar (workers de la app) ----------------
+def version_publicada(destino) -> str:
+    """Versión vigente según el sello (un archivo de pocos bytes)."""
+    return json.loads((Path(destino) / SELLO).read_text())['version']
+
+
+def adjuntar(destino, version: str) -> Publicacion:
+    """Mapea la versión publicada: las columnas numéricas y las posiciones de los
+    índices quedan como vistas sobre el archivo, compartidas entre procesos."""
+    carpeta = Path(destino) / version
+    meta = json.loads((carpeta / 'indices.json').read_text())
+
+    with pa.memory_map(str(carpeta / 'datos.arrow'), 'r') as fuente:
+        tabla = pa.ipc.open_file(fuente).read_all()
+    df = tabla.to_pandas(split_blocks=True, self_destruct=True)
+    df.attrs.update({'version': version, 'memoria_mb': meta.get('memoria_mb')})
+
+    def grupo(nombre):
+        return (np.load(carpeta / f'{nombre}-orden.npy', mmap_mode='r'),
+                meta['valores'][nombre],
+                np.load(carpeta / f'{nombre}-limites.npy', mmap_mode='r'))
+
+    indice_filtros = IndiceFiltros.desde_grupos(
+        meta['n_filas'], {col: grupo(nombre) for col, nombre in meta['filtros'].items()})
+    indice_estudiantes = IndiceEstudiantes.desde_grupo(grupo('estudiantes'), meta['n_filas'])
+    return Publicacion(version, df, indice_filtros, indice_estudiantes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Publica los datos de la app para varios workers.')
+    parser.add_argument('--destino', default=config.DIR_COMPARTIDO or '/dev/shm/pties')
+    parser.add_argument('--datos', default=config.DIR_DATOS or config.ARCHIVO_DATOS,
+                        help='Libro de calificaciones o carpeta de cohortes')
+    parser.add_argument('--intervalo', type=float, default=0,
+                        help='Con una carpeta de cohortes, segundos entre revisiones (0 = publicar y salir)')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+
+    from fuentes import FuenteDatos
+
+    Path(args.destino).mkdir(parents=True, exist_ok=True)
+    ruta = Path(args.datos)
+    if not ruta.is_dir():
+        publicar(leer_datos(ruta), args.destino)
+        return
+    fuente = FuenteDatos(ruta)
+    publicar(fuente.datos(), args.destino)
+    if args.intervalo:
+        # Cada versión nueva de la carpeta se publica antes de quedar vigente
+        fuente.al_actualizar(lambda df: publicar(
+            df, args.destino,
+            fuente.combinado(df, IndiceFiltros, IndiceFiltros.combinar),
+            fuente.combinado(df, IndiceEstudiantes, IndiceEstudiantes.combinar)))
+        while True:
+            time.sleep(args.intervalo)
+            fuente.actualizar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# config.py
+# Parámetros de despliegue de la app PTIES.
+# Todos se pueden sobrescribir con variables de entorno sin tocar el código.
+
+import os
+from pathlib import Path
+
+# ---------------- Datos ----------------
+# Libro de Excel con las calificaciones
+ARCHIVO_DATOS = os.environ.get('PTIES_DATOS', 'Calificaciones_.xlsx')
+
+# Carpeta donde se guardan los snapshots y demás artefactos derivados.
+# Varios procesos de Streamlit pueden compartirla.
+DIR_CACHE = Path(os.environ.get('PTIES_CACHE', '.cache_pties'))
+
+# Carpeta con varios libros (.xlsx/.csv), uno por cohorte. Si se define,
+# reemplaza a ARCHIVO_DATOS y la carpeta se revisa cada DATOS_INTERVALO_S segundos.
+DIR_DATOS = os.environ.get('PTIES_DIR_DATOS', '')
+DATOS_INTERVALO_S = float(os.environ.get('PTIES_DATOS_INTERVALO_S', 60))
+
+# Carpeta donde un proceso cargador publica los datos y sus índices para varios
+# workers (ver compartido.py; p. ej. /dev/shm/pties). Si se define, la app no lee
+# ARCHIVO_DATOS ni DIR_DATOS: mapea la versión publicada vigente.
+DIR_COMPARTIDO = os.environ.get('PTIES_COMPARTIDO', '')
+
+# Motor de las agregaciones: 'pandas' (en memoria), 'duckdb' o 'sqlite'
+# (consultas SQL sobre una base embebida en DIR_CACHE/sql; ver consultas_sql.py).
+# 'duckdb' requiere el paquete duckdb (en requirements.txt); si no está
+# instalado se usa SQLite, que ejecuta cada consulta en un solo hilo.
+BACKEND = os.environ.get('PTIES_BACKEND', 'pandas')
+
+# ---------------- Caché de figuras ----------------
+# Memoria máxima (MB de JSON) para las figuras Plotly reutilizadas entre reruns
+FIGURAS_MAX_MB = float(os.environ.get('PTIES_FIGURAS_MAX_MB', 64))
+
+# ---------------- Caché de resultados ----------------
+# Memoria máxima (MB) para las tablas agregadas compartidas entre sesiones
+RESULTADOS_MAX_MB = float(os.environ.get('PTIES_RESULTADOS_MAX_MB', 256))
+# Segundos que una entrada (tabla o figura) sigue siendo válida; 0 = sin vencimiento
+CACHE_TTL_S = float(os.environ.get('PTIES_CACHE_TTL_S', 3600))
+
+# ---------------- Box plots ----------------
+# Por encima de este número de estudiantes las cajas se calculan en el servidor
+# y solo se envía una muestra de puntos al navegador
+CAJA_UMBRAL_PUNTOS = int(os.environ.get('PTIES_CAJA_UMBRAL_PUNTOS', 3000))
+# Tamaño máximo de la muestra de puntos
+CAJA_MAX_PUNTOS = int(os.environ.get('PTIES_CAJA_MAX_PUNTOS', 1500))
+# 'muestra' (muestra estratificada, atípicos primero) o 'atipicos' (solo atípicos)
+CAJA_PUNTOS = os.environ.get('PTIES_CAJA_PUNTOS', 'muestra')
+
+# ---------------- Informes socioemocionales ----------------
+# Carpeta con un PDF por municipio (nombre del archivo = municipio)
+DIR_SOCIOE = os.environ.get('PTIES_SOCIOE', 'SOCIOE')
+
+# ---------------- Imágenes ----------------
+# Las variantes web se generan a (ancho mostrado x densidad) px para verse nítidas en pantallas HiDPI
+IMAGENES_DENSIDAD = int(os.environ.get('PTIES_IMAGENES_DENSIDAD', 2))
+
+# ---------------- Medición de tiempos ----------------
+# '1' muestra en la barra lateral el panel con los tiempos por sección y el uso de las cachés
+PANEL_ADMIN = os.environ.get('PTIES_PANEL_ADMIN', '') == '1'
+# Archivo donde se agregan las mediciones como líneas JSON; vacío = no se guardan
+ARCHIVO_TIEMPOS = os.environ.get('PTIES_ARCHIVO_TIEMPOS', '')
+
+# ---------------- API JSON ----------------
+# Puerto de la API de resultados (ver api.py), que corre junto a la app
+API_PUERTO = int(os.environ.get('PTIES_API_PUERTO', 8600))
+# Segundos que los clientes pueden reutilizar una respuesta sin revalidarla con su ETag
+API_MAX_AGE_S = int(os.environ.get('PTIES_API_MAX_AGE_S', 60))
@@ -0,0 +1,219 @@
+# consultas_sql.py
+# Backend SQL opcional para las agregaciones de la pestaña "Resultados IEMs".
+# Los datos se cargan una vez por versión en un archivo de base de datos
+# embebida (DuckDB si está instalado, si no SQLite) y cada consulta de
+# CuboResultados (métricas, cajas, pivote y porcentajes) se resuelve con SQL
+# parametrizado. El motor trabaja sobre el archivo, no sobre el DataFrame en
+# memoria, y DuckDB usa varios hilos por consulta.
+#
+# Limitación: la base se crea a partir del DataFrame ya cargado, y la app
+# sigue usando ese DataFrame para los índices de filtros y estudiantes, las
+# opciones de los filtros (JerarquiaFiltros), las evidencias y la pestaña
+# individual. Este modo mueve las agregaciones al motor SQL, pero los datos
+# todavía deben caber en memoria.
+#
+# Se activa con PTIES_BACKEND=duckdb o PTIES_BACKEND=sqlite (ver config.py).
+
+import importlib.util
+import logging
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+import config
+from ingesta import escribir_atomico
+from agregaciones import DIMENSIONES, _a_tabla, porcentaje_por_grupo, promedio_0_100
+
+log = logging.getLogger(__name__)
+
+DUCKDB_DISPONIBLE = importlib.util.find_spec('duckdb') is not None
+
+TABLA = 'calificaciones'
+# Bases que se conservan en DIR_CACHE/sql por motor (la vigente y la anterior,
+# como los dos cubos que guarda cargar_cubo)
+BASES_CONSERVADAS = 2
+# Columnas que necesitan las agregaciones; el resto se queda en pandas
+COLUMNAS = DIMENSIONES + ['NUM_DOCUMENTO', 'COMPETENCIA', 'NIVEL_DE_DESEMPENO', 'CALIFICACION']
+
+
+def _id(columna: str) -> str:
+    """Identificador SQL entre comillas (hay columnas con espacios, p. ej. NOMBRE IEM)."""
+    return '"' + columna.replace('"', '""') + '"'
+
+
+def _valor(valor):
+    """Convierte escalares de numpy a tipos de Python para pasarlos como parámetro."""
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+def _tabla_plana(df: pd.DataFrame) -> pd.DataFrame:
+    """Columnas de COLUMNAS con tipos simples (texto, entero, float64) para cargarlas en la base."""
+    plano = {}
+    for col in COLUMNAS:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype(object).where(serie.notna(), None)
+        elif col == 'CALIFICACION':
+            serie = serie.astype('float64')
+        plano[col] = serie
+    return pd.DataFrame(plano)
+
+
+class CuboSQL:
+    """Misma interfaz que agregaciones.CuboResultados, resuelta con SQL.
+
+    `motor` es 'duckdb' o 'sqlite'. La base se guarda en
+    config.DIR_CACHE/sql/pties-<version>.<motor> y se reutiliza entre
+    procesos mientras la versión de los datos no cambie. Al crear una base se
+    borran las de versiones más viejas (se conservan BASES_CONSERVADAS).
+    """
+
+    def __init__(self, df: pd.DataFrame, motor: str = 'duckdb'):
+        if motor == 'duckdb' and not DUCKDB_DISPONIBLE:
+            log.warning('duckdb no está instalado; se usa SQLite')
+            motor = 'sqlite'
+        self.motor = motor
+        directorio = config.DIR_CACHE / 'sql'
+        directorio.mkdir(parents=True, exist_ok=True)
+        self.ruta = directorio / f'pties-{df.attrs["version"]}.{motor}'
+        if not self.ruta.exists():
+            self._crear(df)
+            self._limpiar()
+        self._con = None
+        self._lock = threading.Lock()
+
+    # ---------------- Carga ----------------
+    def _crear(self, df: pd.DataFrame) -> None:
+        """Crea la base en un temporal y la renombra: otros procesos nunca ven una base a medias."""
+        plano = _tabla_plana(df)
+        indice = ', '.join(_id(c) for c in ('REGION', 'NOMBRE IEM', 'EVALUACION'))
+
+        def crear(tmp):
+            if self.motor == 'duckdb':
+                import duckdb
+                with duckdb.connect(str(tmp)) as con:
+                    con.register('origen', plano)
+                    con.execute(f'CREATE TABLE {TABLA} AS SELECT * FROM origen')
+            else:
+                with sqlite3.connect(tmp) as con:
+                    plano.to_sql(TABLA, con, index=False)
+                    con.execute(f'CREATE INDEX idx_filtros ON {TABLA} ({indice})')
+                con.close()
+
+        escribir_atomico(self.ruta, crear)
+        log.info('Base %s creada con %d filas', self.ruta, len(plano))
+
+    def _limpiar(self) -> None:
+        """Borra las bases de versiones anteriores del mismo motor.
+
+        Se conserva la anterior a la vigente: las sesiones (y otros procesos)
+        que aún usan esa versión pueden abrirla hasta que cambien de versión.
+        """
+        bases = sorted(self.ruta.parent.glob(f'pties-*.{self.motor}'),
+                       key=lambda p: p.stat().st_mtime, reverse=True)
+        for vieja in bases[BASES_CONSERVADAS:]:
+            if vieja != self.ruta:
+                try:
+                    vieja.unlink(missing_ok=True)
+                except OSError as e:  # abierta por otro proceso (Windows): se intenta en la próxima versión
+                    log.warning('No se pudo borrar la base %s: %s', vieja, e)
+
+    def _conexion(self):
+        """Conexión de solo lectura compartida por todos los hilos del proceso.
+
+        Streamlit ejecuta cada rerun en un hilo nuevo, así que una conexión por
+        hilo dejaría una abierta por cada ejecución. Cada consulta usa su
+        propio cursor sobre esta conexión y lo cierra al terminar.
+        """
+        if self._con is None:
+            with self._lock:
+                if self._con is None:
+                    if self.motor == 'duckdb':
+                        import duckdb
+                        self._con = duckdb.connect(str(self.ruta), read_only=True)
+                    else:
+                        # El módulo sqlite3 se compila en modo serializado: la conexión se puede compartir
+                        self._con = sqlite3.connect(f'file:{self.ruta}?mode=ro', uri=True, check_same_thread=False)
+        return self._con
+
+    def _consultar(self, sql: str, parametros: list) -> pd.DataFrame:
+        con = self._conexion()
+        if self.motor == 'duckdb':
+            with con.cursor() as cursor:
+                return cursor.execute(sql, parametros).df()
+        cursor = con.cursor()
+        try:
+            filas = cursor.execute(sql, parametros).fetchall()
+            return pd.DataFrame.from_records(filas, columns=[d[0] for d in cursor.description])
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _where(filtros: dict, *no_nulas: str) -> tuple[str, list]:
+        """Cláusula WHERE con un parámetro por filtro (solo columnas de DIMENSIONES)."""
+        condiciones, parametros = [], []
+        for col, valor in filtros.items():
+            if col not in DIMENSIONES:
+                raise KeyError(col)
+            condiciones.append(f'{_id(col)} = ?')
+            parametros.append(_valor(valor))
+        condiciones += [f'{_id(col)} IS NOT NULL' for col in no_nulas]
+        return (' WHERE ' + ' AND '.join(condiciones)) if condiciones else '', parametros
+
+    # ---------------- Consultas ----------------
+    def metricas(self, filtros: dict) -> dict:
+        """Número de estudiantes y puntaje promedio de Matemáticas y Lenguaje."""
+        where, parametros = self._where(filtros)
+        fila = self._consultar(f'''
+            SELECT COUNT(DISTINCT NUM_DOCUMENTO) AS estudiantes,
+                   SUM(CASE WHEN EVALUACION = 'MATEMATICAS' THEN CALIFICACION END) AS suma_mat,
+                   COUNT(DISTINCT CASE WHEN EVALUACION = 'MATEMATICAS' THEN NUM_DOCUMENTO END) AS n_mat,
+                   SUM(CASE WHEN EVALUACION = 'LENGUAJE' THEN CALIFICACION END) AS suma_len,
+                   COUNT(DISTINCT CASE WHEN EVALUACION = 'LENGUAJE' THEN NUM_DOCUMENTO END) AS n_len
+            FROM {TABLA}{where}
+        ''', parametros).iloc[0]
+
+        def promedio(suma, n):
+            return (0.0 if pd.isna(suma) else float(suma)) / max(int(n), 1)
+
+        return {
+            'estudiantes': int(fila['estudiantes']),
+            'promedio_matematicas': promedio(fila['suma_mat'], fila['n_mat']),
+            'promedio_lenguaje': promedio(fila['suma_len'], fila['n_len']),
+        }
+
+    def datos_caja(self, filtros: dict, por_evaluacion: bool = False) -> pd.DataFrame:
+        """Puntaje total por estudiante (MUNICIPIO, NUM_DOCUMENTO, GRADO[, EVALUACION])."""
+        claves = ['MUNICIPIO', 'NUM_DOCUMENTO', 'GRADO'] + (['EVALUACION'] if por_evaluacion else [])
+        columnas = ', '.join(_id(c) for c in claves)
+        where, parametros = self._where(filtros, *claves)
+        return self._consultar(f'''
+            SELECT {columnas}, COALESCE(SUM(CALIFICACION), 0) AS CALIFICACION
+            FROM {TABLA}{where}
+            GROUP BY {columnas}
+            ORDER BY {columnas}
+        ''', parametros)
+
+    def pivote(self, filtros: dict) -> pd.DataFrame:
+        """Desempeño promedio (0-100) por NOMBRE IEM x COMPETENCIA."""
+        where, parametros = self._where(filtros, 'NOMBRE IEM', 'COMPETENCIA')
+        totales = self._consultar(f'''
+            SELECT "NOMBRE IEM", COMPETENCIA, SUM(CALIFICACION) AS suma, COUNT(CALIFICACION) AS n
+            FROM {TABLA}{where}
+            GROUP BY "NOMBRE IEM", COMPETENCIA
+        ''', parametros).set_index(['NOMBRE IEM', 'COMPETENCIA'])
+        return _a_tabla(promedio_0_100(totales['suma'], totales['n']), 'COMPETENCIA')
+
+    def porcentajes(self, filtros: dict) -> pd.DataFrame:
+        """Frecuencia y porcentaje de respuestas por COMPETENCIA x NIVEL_DE_DESEMPENO."""
+        where, parametros = self._where(filtros, 'COMPETENCIA', 'NIVEL_DE_DESEMPENO')
+        df_percent = self._consultar(f'''
+            SELECT COMPETENCIA, NIVEL_DE_DESEMPENO, COUNT(*) AS frecuencia
+            FROM {TABLA}{where}
+            GROUP BY COMPETENCIA, NIVEL_DE_DESEMPENO
+            ORDER BY COMPETENCIA, NIVEL_DE_DESEMPENO
+        ''', parametros)
+        df_percent['porcentaje'] = porcentaje_por_grupo(df_percent)
+        return df_percent
@@ -0,0 +1,235 @@
+# exportar.py
+# Exportación masiva de los resultados individuales (lo que muestra la pestaña
+# "Resultados Individuales"), sin pasar por la app.
+#
+# Los resultados de todos los estudiantes se calculan en una sola pasada
+# vectorizada (un groupby por tabla) y la escritura se reparte en lotes entre
+# varios procesos.
+#
+# Uso:
+#   python exportar.py --salida reportes/ --formato html
+#   python exportar.py --salida reportes/ --formato jsonl --iem "IEM X" --procesos 4
+#
+# Formatos:
+#   json   un archivo <codigo>.json por estudiante
+#   html   un archivo <codigo>.html por estudiante
+#   jsonl  un archivo por lote (reportes-NNN.jsonl) más indice.json
+#          con {codigo: [archivo, posición, longitud]} para leer un estudiante
+#          sin recorrer el archivo completo
+
+import argparse
+import html
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import config
+from agregaciones import porcentaje_por_grupo, promedio_0_100
+from fuentes import FuenteDatos
+from ingesta import leer_datos
+
+log = logging.getLogger(__name__)
+
+FORMATOS = ('json', 'html', 'jsonl')
+COLUMNAS_INFO = ['REGION', 'NOMBRE IEM', 'MUNICIPIO', 'GRADO', 'GENERO']
+
+
+# ---------------- Cálculo vectorizado ----------------
+def calcular_resultados(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Tablas con los resultados de todos los estudiantes, ordenadas por NUM_DOCUMENTO.
+
+    - ``info``: región, IEM, municipio, grado y género de cada estudiante.
+    - ``puntajes``: puntaje total por evaluación (MATEMATICAS, LENGUAJE).
+    - ``competencias``: desempeño promedio (0-100) por competencia.
+    - ``niveles``: frecuencia y porcentaje de preguntas por competencia y nivel.
+
+    Son las mismas cifras que la pestaña individual calcula estudiante por estudiante.
+    """
+    calificacion = df['CALIFICACION'].astype('float64')
+    documento = df['NUM_DOCUMENTO'].astype(str).where(df['NUM_DOCUMENTO'].notna())
+    base = df.assign(NUM_DOCUMENTO=documento, CALIFICACION=calificacion).dropna(subset=['NUM_DOCUMENTO'])
+
+    info = base.groupby('NUM_DOCUMENTO', sort=True)[COLUMNAS_INFO].first()
+
+    puntajes = (
+        base.groupby(['NUM_DOCUMENTO', 'EVALUACION'], observed=True)['CALIFICACION']
+        .sum()
+        .unstack('EVALUACION')
+        .rename(columns=str)
+        .reindex(columns=['MATEMATICAS', 'LENGUAJE'])
+        .fillna(0.0)
+        .reindex(info.index, fill_value=0.0)
+    )
+
+    totales = (
+        base.assign(n=calificacion.notna().astype('int64'))
+        .groupby(['NUM_DOCUMENTO', 'COMPETENCIA'], observed=True)[['CALIFICACION', 'n']]
+        .sum()
+    )
+    competencias = promedio_0_100(totales['CALIFICACION'], totales['n']).dropna().rename('desempeno').reset_index()
+
+    niveles = (
+        base.groupby(['NUM_DOCUMENTO', 'COMPETENCIA', 'NIVEL_DE_DESEMPENO'], observed=True)
+        .size()
+        .reset_index(name='frecuencia')
+    )
+    niveles['porcentaje'] = porcentaje_por_grupo(niveles, grupo=['NUM_DOCUMENTO', 'COMPETENCIA']).round(2)
+
+    return {'info': info.reset_index(), 'puntajes': puntajes.reset_index(),
+            'competencias': competencias, 'niveles': niveles}
+
+
+def _lotes(tablas: dict[str, pd.DataFrame], n_lotes: int):
+    """Divide las tablas en `n_lotes` grupos de estudiantes contiguos (todas vienen ordenadas por documento)."""
+    codigos = tablas['info']['NUM_DOCUMENTO'].to_numpy()
+    for parte in np.array_split(codigos, n_lotes):
+        if not len(parte):
+            continue
+        desde, hasta = parte[0], parte[-1]
+        yield {
+            nombre: tabla[(tabla['NUM_DOCUMENTO'] >= desde) & (tabla['NUM_DOCUMENTO'] <= hasta)]
+            for nombre, tabla in tablas.items()
+        }
+
+
+# ---------------- Escritura ----------------
+def _registros(lote: dict[str, pd.DataFrame]):
+    """Un dict por estudiante con todos sus resultados, listo para serializar."""
+    def por_estudiante(tabla, columnas):
+        # Columnas como listas de Python: iterar el DataFrame fila a fila es mucho más lento
+        grupos = {}
+        valores = [tabla[col].tolist() for col in columnas]
+        for codigo, *fila in zip(tabla['NUM_DOCUMENTO'].tolist(), *valores):
+            grupos.setdefault(codigo, []).append(dict(zip(columnas, fila)))
+        return grupos
+
+    competencias = por_estudiante(lote['competencias'].astype({'COMPETENCIA': str}),
+                                  ['COMPETENCIA', 'desempeno'])
+    niveles = por_estudiante(lote['niveles'].astype({'COMPETENCIA': str, 'NIVEL_DE_DESEMPENO': str}),
+                             ['COMPETENCIA', 'NIVEL_DE_DESEMPENO', 'frecuencia', 'porcentaje'])
+    puntajes = lote['puntajes'].set_index('NUM_DOCUMENTO').round(2).to_dict('index')
+
+    info = lote['info']
+    columnas_info = [[None if pd.isna(valor) else valor for valor in info[col].tolist()] for col in COLUMNAS_INFO]
+    for codigo, *fila in zip(info['NUM_DOCUMENTO'].tolist(), *columnas_info):
+        yield {
+            'codigo': codigo,
+            **dict(zip(COLUMNAS_INFO, fila)),
+            'puntajes': puntajes[codigo],
+            'competencias': competencias.get(codigo, []),
+            'niveles': niveles.get(codigo, []),
+        }
+
+
+def resultado_estudiante(df_estudiante: pd.DataFrame) -> dict | None:
+    """Registro de un estudiante (las filas de un solo NUM_DOCUMENTO), con el mismo formato que la exportación."""
+    return next(_registros(calcular_resultados(df_estudiante)), None)
+
+
+def _nombre_archivo(codigo: str) -> str:
+    return re.sub(r'[^\w.-]', '_', codigo)
+
+
+def _html(registro: dict) -> str:
+    e = lambda valor: html.escape(str(valor))
+    filas = lambda datos, campos: ''.join(
+        '<tr>' + ''.join(f'<td>{e(d[c])}</td>' for c in campos) + '</tr>' for d in datos
+    )
+    info = ''.join(f'<li><b>{e(col)}:</b> {e(registro[col])}</li>' for col in COLUMNAS_INFO)
+    puntajes = ''.join(f'<li><b>{e(ev)}:</b> {v:.2f}</li>' for ev, v in registro['puntajes'].items())
+    return f'''<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>Resultados {e(registro['codigo'])}</title></head>
+<body>
+<h1>Resultados PTIES - {e(registro['codigo'])}</h1>
+<ul>{info}</ul>
+<h2>Puntajes</h2><ul>{puntajes}</ul>
+<h2>Desempeño Promedio por Competencia (0-100)</h2>
+<table border="1"><tr><th>Competencia</th><th>Desempeño</th></tr>{filas(registro['competencias'], ['COMPETENCIA', 'desempeno'])}</table>
+<h2>Distribución porcentual por Competencia y Nivel de Desempeño</h2>
+<table border="1"><tr><th>Competencia</th><th>Nivel</th><th>Preguntas</th><th>%</th></tr>{filas(registro['niveles'], ['COMPETENCIA', 'NIVEL_DE_DESEMPENO', 'frecuencia', 'porcentaje'])}</table>
+</body></html>
+'''
+
+
+def _escribir_lote(numero: int, lote: dict[str, pd.DataFrame], salida: str, formato: str) -> dict:
+    """Escribe los reportes de un lote (corre en un proceso del pool); devuelve el índice del lote."""
+    salida = Path(salida)
+    indice = {}
+    if formato == 'jsonl':
+        archivo = f'reportes-{numero:03d}.jsonl'
+        with open(salida / archivo, 'wb') as f:
+            for registro in _registros(lote):
+                linea = (json.dumps(registro, ensure_ascii=False) + '\n').encode()
+                indice[registro['codigo']] = [archivo, f.tell(), len(linea)]
+                f.write(linea)
+        return indice
+
+    for registro in _registros(lote):
+        archivo = f"{_nombre_archivo(registro['codigo'])}.{formato}"
+        if formato == 'json':
+            contenido = json.dumps(registro, ensure_ascii=False, indent=1)
+        else:
+            contenido = _html(registro)
+        (salida / archivo).write_text(contenido, encoding='utf-8')
+        indice[registro['codigo']] = [archivo]
+    return indice
+
+
+def exportar(df: pd.DataFrame, salida, formato: str = 'json', procesos: int | None = None) -> dict:
+    """Calcula y escribe los reportes de todos los estudiantes de `df`; devuelve los tiempos."""
+    if formato not in FORMATOS:
+        raise ValueError(f'Formato no soportado: {formato} (use {", ".join(FORMATOS)})')
+    salida = Path(salida)
+    salida.mkdir(parents=True, exist_ok=True)
+    procesos = procesos or os.cpu_count() or 1
+
+    inicio = time.perf_counter()
+    tablas = calcular_resultados(df)
+    calculo = time.perf_counter() - inicio
+
+    n_estudiantes = len(tablas['info'])
+    # Varios lotes por proceso para repartir mejor la carga
+    n_lotes = max(1, min(n_estudiantes, procesos * 4))
+    indice = {}
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = [pool.submit(_escribir_lote, i, lote, str(salida), formato)
+                   for i, lote in enumerate(_lotes(tablas, n_lotes))]
+        for futuro in futuros:
+            indice.update(futuro.result())
+    (salida / 'indice.json').write_text(json.dumps(indice, ensure_ascii=False))
+    total = time.perf_counter() - inicio
+
+    return {'estudiantes': n_estudiantes, 'calculo_s': calculo, 'total_s': total,
+            'estudiantes_por_s': n_estudiantes / total if total else float('inf')}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Exporta los resultados individuales de todos los estudiantes.')
+    parser.add_argument('--datos', default=config.DIR_DATOS or config.ARCHIVO_DATOS,
+                        help='Libro de calificaciones o carpeta de cohortes (por defecto, la de config.py)')
+    parser.add_argument('--salida', required=True, help='Carpeta donde se escriben los reportes')
+    parser.add_argument('--formato', choices=FORMATOS, default='json')
+    parser.add_argument('--procesos', type=int, default=None, help='Procesos de escritura (por defecto, uno por CPU)')
+    parser.add_argument('--iem', action='append', help='Exportar solo estos IEM (se puede repetir)')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    ruta = Path(args.datos)
+    df = FuenteDatos(ruta).datos() if ruta.is_dir() else leer_datos(ruta)
+    if args.iem:
+        df = df[df['NOMBRE IEM'].isin(args.iem)]
+
+    tiempos = exportar(df, args.salida, args.formato, args.procesos)
+    log.info('%d estudiantes en %.2f s (cálculo %.2f s): %.0f estudiantes/s',
+             tiempos['estudiantes'], tiempos['total_s'], tiempos['calculo_s'], tiempos['estudiantes_por_s'])
+
+
+if __name__ == '__main__':
+    main()
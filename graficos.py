@@ -0,0 +1,184 @@
+# graficos.py
+# Construcción de las figuras Plotly de la app y caché de figuras ya construidas.
+# Armar una figura con plotly.express (sobre todo los box plot con points='all')
+# es lo más costoso de la página; si los filtros no cambiaron, la figura se reutiliza.
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+import config
+from agregaciones import envolver_etiquetas
+from cache import CacheLRU
+
+COLORES_NIVEL = {'BAJO': '#d62728', 'MEDIO': '#1f77b4', 'ALTO': '#2ca02c'}
+ORDEN_NIVEL = ['BAJO', 'MEDIO', 'ALTO']
+
+
+# ---------------- Box plots resumidos ----------------
+def estadisticas_caja(valores: np.ndarray) -> dict:
+    """Cuartiles y bigotes (1.5 IQR, como Plotly) de un grupo de valores."""
+    q1, mediana, q3 = np.percentile(valores, [25, 50, 75])
+    rango = q3 - q1
+    dentro = valores[(valores >= q1 - 1.5 * rango) & (valores <= q3 + 1.5 * rango)]
+    return {'q1': q1, 'median': mediana, 'q3': q3,
+            'lowerfence': dentro.min(), 'upperfence': dentro.max()}
+
+
+def _muestra_estratificada(df_box, x, y, color, max_puntos, solo_atipicos, semilla=0):
+    """Estadísticas de cada caja y una muestra acotada de puntos, proporcional a cada grupo.
+
+    Los atípicos tienen prioridad dentro del cupo de su grupo. La semilla es
+    fija para que la misma selección produzca la misma figura.
+    """
+    rng = np.random.default_rng(semilla)
+    total = len(df_box)
+    estadisticas, partes = [], []
+    for (grupo_color, valor_x), grupo in df_box.groupby([color, x], observed=True, sort=False):
+        valores = grupo[y].to_numpy(dtype='float64')
+        est = estadisticas_caja(valores)
+        estadisticas.append((grupo_color, valor_x, est))
+
+        atipico = (valores < est['lowerfence']) | (valores > est['upperfence'])
+        cupo = max(1, int(max_puntos * len(valores) / total))
+        elegidas = np.flatnonzero(atipico)
+        if len(elegidas) > cupo:
+            elegidas = rng.choice(elegidas, cupo, replace=False)
+        if not solo_atipicos and len(elegidas) < cupo:
+            normales = np.flatnonzero(~atipico)
+            extra = rng.choice(normales, min(cupo - len(elegidas), len(normales)), replace=False)
+            elegidas = np.concatenate([elegidas, extra])
+        partes.append(grupo.iloc[np.sort(elegidas)])
+    return estadisticas, pd.concat(partes)
+
+
+def figura_caja(df_box: pd.DataFrame, x: str, color: str, title: str, y: str = 'CALIFICACION'):
+    """Box plot con un punto por estudiante.
+
+    Hasta config.CAJA_UMBRAL_PUNTOS filas se envían todos los puntos y Plotly
+    calcula las cajas en el navegador. Por encima, los cuartiles y bigotes se
+    calculan aquí (trazas con q1/median/q3 precalculados) y solo se envía una
+    muestra estratificada de config.CAJA_MAX_PUNTOS puntos, o solo los
+    atípicos si config.CAJA_PUNTOS == 'atipicos'.
+    """
+    if len(df_box) <= config.CAJA_UMBRAL_PUNTOS:
+        return px.box(df_box, x=x, y=y, color=color, points='all', title=title)
+
+    # Colores y orden fijados sobre los datos completos, no sobre la muestra
+    orden = pd.unique(df_box[color]).tolist()
+    paleta = px.colors.qualitative.Plotly
+    colores = {str(g): paleta[i % len(paleta)] for i, g in enumerate(orden)}
+
+    estadisticas, muestra = _muestra_estratificada(
+        df_box, x, y, color, config.CAJA_MAX_PUNTOS, config.CAJA_PUNTOS == 'atipicos'
+    )
+    fig = px.box(
+        muestra, x=x, y=y, color=color, points='all', title=title,
+        category_orders={color: orden}, color_discrete_map=colores,
+    )
+    # Las trazas de px solo aportan los puntos: su caja queda invisible
+    fig.update_traces(showlegend=False, fillcolor='rgba(0,0,0,0)', line_width=0, hoveron='points')
+
+    cajas = []
+    for grupo_color in orden:
+        filas = [(valor_x, est) for g, valor_x, est in estadisticas if g == grupo_color]
+        nombre = str(grupo_color)
+        cajas.append(go.Box(
+            name=nombre, legendgroup=nombre, offsetgroup=nombre, alignmentgroup='True',
+            x=[valor_x for valor_x, _ in filas], marker_color=colores[nombre], boxpoints=False,
+            **{k: [est[k] for _, est in filas] for k in ('q1', 'median', 'q3', 'lowerfence', 'upperfence')},
+        ))
+    fig.add_traces(cajas)
+    fig.data = fig.data[len(fig.data) - len(cajas):] + fig.data[:len(fig.data) - len(cajas)]
+    fig.update_layout(
+        legend_title_text=color,
+        title_subtitle_text=f'Puntos: muestra de {len(muestra):,} de {len(df_box):,} estudiantes',
+    )
+    return fig
+
+
+# ---------------- Figuras ----------------
+def figura_caja_municipios(df_box: pd.DataFrame, materias: str):
+    """Distribución del puntaje total por municipio (un punto por estudiante)."""
+    fig_box = figura_caja(df_box, x='MUNICIPIO', color='MUNICIPIO',
+                          title=f'Distribución de puntajes por IEM {materias}')
+    fig_box.update_layout(title_font=dict(size=20))
+    return fig_box
+
+
+def figura_histograma_grados(df_box: pd.DataFrame, materias: str):
+    """Puntaje promedio por municipio y grado."""
+    fig_hist = px.histogram(
+        df_box, x='MUNICIPIO', y='CALIFICACION', color='GRADO', barmode='group',
+        title=f'Puntaje Promedio por IEM y Grado {materias}', histfunc='avg'
+    )
+    fig_hist.update_layout(title_font=dict(size=20))
+    return fig_hist
+
+
+def figura_caja_grados(df_box: pd.DataFrame):
+    """Distribución del puntaje por grado y evaluación (caso de un IEM o municipio)."""
+    fig_box = figura_caja(df_box, x='GRADO', color='EVALUACION',
+                          title='Distribución de puntajes por grado')
+    fig_box.update_layout(title_font=dict(size=20))
+    return fig_box
+
+
+def figura_niveles(df_percent: pd.DataFrame):
+    """Barras apiladas con el porcentaje de cada nivel de desempeño por competencia."""
+    df_percent = df_percent.assign(COMPETENCIA_WRAP=envolver_etiquetas(df_percent['COMPETENCIA']))  # solo primer salto
+    fig_stack = px.bar(
+        df_percent,
+        x='COMPETENCIA_WRAP',
+        y='porcentaje',
+        color='NIVEL_DE_DESEMPENO',
+        text='porcentaje',
+        category_orders={'NIVEL_DE_DESEMPENO': ORDEN_NIVEL},
+        color_discrete_map=COLORES_NIVEL
+    )
+    fig_stack.update_traces(texttemplate='%{text:.1f}%', textposition='inside')
+    fig_stack.update_layout(yaxis=dict(title='Porcentaje', range=[0, 100]), barmode='stack')
+    return fig_stack
+
+
+# ---------------- Caché de figuras ----------------
+def clave_filtros(filtros: dict) -> tuple:
+    """Forma canónica de los filtros activos, usable como parte de una clave de caché."""
+    return tuple(sorted((col, str(valor)) for col, valor in filtros.items()))
+
+
+# Propiedades de las trazas que pueden llevar un valor por punto
+PROPIEDADES_ARRAY = ('x', 'y', 'text', 'customdata', 'hovertext',
+                     'q1', 'median', 'q3', 'lowerfence', 'upperfence', 'mean')
+# JSON aproximado del layout y de las propiedades escalares de una figura
+BYTES_LAYOUT = 8 * 1024
+# Bytes aproximados de cada valor de texto en el JSON
+BYTES_POR_TEXTO = 16
+
+
+def _tamano_valores(valor) -> int:
+    """Bytes aproximados de un valor de traza en el JSON (los arrays numéricos van en base64)."""
+    if valor is None:
+        return 0
+    if isinstance(valor, np.ndarray):
+        if valor.dtype.kind in 'biuf':
+            return valor.nbytes * 4 // 3
+        return valor.size * BYTES_POR_TEXTO
+    if isinstance(valor, (list, tuple)):
+        return len(valor) * BYTES_POR_TEXTO
+    return len(str(valor))
+
+
+class CacheFiguras(CacheLRU):
+    """Caché LRU de figuras construidas, limitada por el tamaño (estimado) de su JSON.
+
+    Es compartida por todas las sesiones del proceso, así que las claves deben
+    incluir la versión de los datos. Las figuras guardadas no se modifican.
+    """
+
+    def _tamano(self, figura) -> int:
+        # Estimación a partir de los arrays de cada traza: serializar la figura
+        # solo para medirla duplicaría el costo de st.plotly_chart
+        return BYTES_LAYOUT + sum(_tamano_valores(traza[nombre])
+                                  for traza in figura.data for nombre in PROPIEDADES_ARRAY if nombre in traza)
@@ -0,0 +1,228 @@
+# indices.py
+# Índices construidos una sola vez por versión de los datos.
+# Evitan recorrer la tabla completa en cada interacción de la app.
+
+import numpy as np
+import pandas as pd
+
+# Columnas que se pueden filtrar en la pestaña "Resultados IEMs"
+COLUMNAS_FILTRO = ('REGION', 'NOMBRE IEM', 'GRADO', 'GENERO', 'EVALUACION')
+
+
+def _agrupar_posiciones(serie: pd.Series):
+    """Ordena las posiciones de fila por valor.
+
+    Devuelve ``(orden, valores, limites)``: las filas con ``valores[i]`` son
+    ``orden[limites[i]:limites[i + 1]]``, en orden creciente. Los vacíos se omiten.
+    """
+    codigos, valores = pd.factorize(serie, sort=False)
+    orden = np.argsort(codigos, kind='stable')  # estable: posiciones crecientes en cada grupo
+    vacios = np.count_nonzero(codigos < 0)  # los vacíos (-1) quedan al principio
+    limites = np.concatenate(([0], np.cumsum(np.bincount(codigos[codigos >= 0], minlength=len(valores)))))
+    return orden[vacios:], valores.tolist(), limites
+
+
+def _posiciones_por_valor(grupo: tuple) -> dict:
+    """{valor: array ordenado de posiciones} a partir de ``(orden, valores, limites)``.
+
+    Los arrays son vistas de `orden`, sin copia (también si `orden` está en memoria compartida).
+    """
+    orden, valores, limites = grupo
+    return {valor: orden[limites[i]:limites[i + 1]] for i, valor in enumerate(valores)}
+
+
+def _combinar_grupos(grupos: list, longitudes: list) -> tuple:
+    """Une los ``(orden, valores, limites)`` de partes consecutivas de una tabla.
+
+    Las posiciones de cada parte se desplazan por el largo de las anteriores y
+    se copian a su lugar en el grupo del valor, después de las de las partes
+    previas: no se vuelve a leer la columna ni a ordenar.
+    """
+    valores = list(dict.fromkeys(valor for _, vals, _ in grupos for valor in vals))
+    codigo_de = {valor: i for i, valor in enumerate(valores)}
+    mapas = [np.array([codigo_de[valor] for valor in vals], dtype=np.intp) for _, vals, _ in grupos]
+    conteos = np.zeros((len(grupos), len(valores)), dtype=np.intp)
+    for fila, mapa, (_, _, limites) in zip(conteos, mapas, grupos):
+        fila[mapa] = np.diff(limites)
+    limites = np.concatenate(([0], np.cumsum(conteos.sum(axis=0))))
+    # Dónde empiezan las filas de cada parte dentro del grupo de cada valor
+    inicios = limites[:-1] + np.cumsum(conteos, axis=0) - conteos
+
+    orden = np.empty(limites[-1], dtype=np.intp)
+    desplazamiento = 0
+    for inicio, mapa, (orden_parte, _, limites_parte), n in zip(inicios, mapas, grupos, longitudes):
+        destino = np.repeat(inicio[mapa] - limites_parte[:-1], np.diff(limites_parte)) + np.arange(limites_parte[-1])
+        orden[destino] = np.asarray(orden_parte) + desplazamiento
+        desplazamiento += n
+    return orden, valores, limites
+
+
+class IndiceFiltros:
+    """Índice invertido valor -> posiciones de fila para las columnas de filtro.
+
+    Filtrar consiste en intersectar los arrays de posiciones de cada filtro
+    activo (empezando por el más corto) y tomar solo esas filas, en lugar de
+    comparar la columna completa y copiar el DataFrame en cada paso.
+    """
+
+    def __init__(self, df: pd.DataFrame, columnas=COLUMNAS_FILTRO):
+        self._iniciar(len(df), {col: _agrupar_posiciones(df[col]) for col in columnas if col in df.columns})
+
+    @classmethod
+    def desde_grupos(cls, n_filas: int, grupos: dict) -> 'IndiceFiltros':
+        """Índice a partir de ``{columna: (orden, valores, limites)}`` ya calculados (ver compartido.py)."""
+        indice = cls.__new__(cls)
+        indice._iniciar(n_filas, grupos)
+        return indice
+
+    @classmethod
+    def combinar(cls, partes: list) -> 'IndiceFiltros':
+        """Índice de la concatenación de las tablas indexadas por `partes` (en ese orden)."""
+        longitudes = [parte.n_filas for parte in partes]
+        grupos = {col: _combinar_grupos([parte.grupos[col] for parte in partes], longitudes)
+                  for col in partes[0].grupos}
+        return cls.desde_grupos(sum(longitudes), grupos)
+
+    def _iniciar(self, n_filas: int, grupos: dict) -> None:
+        self.n_filas = n_filas
+        self.grupos = grupos
+        self.posiciones = {col: _posiciones_por_valor(grupo) for col, grupo in grupos.items()}
+
+    def posiciones_filtradas(self, filtros: dict) -> np.ndarray | None:
+        """Posiciones que cumplen todos los filtros; None si no hay filtros activos."""
+        listas = []
+        for col, valor in filtros.items():
+            pos = self.posiciones[col].get(valor)
+            if pos is None:
+                return np.empty(0, dtype=np.intp)
+            listas.append(pos)
+        if not listas:
+            return None
+
+        listas.sort(key=len)
+        resultado = listas[0]
+        for pos in listas[1:]:
+            if not len(resultado):
+                break
+            resultado = np.intersect1d(resultado, pos, assume_unique=True)
+        return resultado
+
+    def filtrar(self, df: pd.DataFrame, filtros: dict) -> pd.DataFrame:
+        """Filas de `df` que cumplen `filtros` ({columna: valor}). Sin filtros devuelve `df` tal cual."""
+        pos = self.posiciones_filtradas(filtros)
+        return df if pos is None else df.take(pos)
+
+
+class IndiceEstudiantes:
+    """Índice NUM_DOCUMENTO -> filas del estudiante.
+
+    Guarda un único array de posiciones ordenado por documento y, por cada
+    documento, el rango que le corresponde. Consultar si un código existe es
+    O(1) y obtener sus filas cuesta O(filas del estudiante).
+    """
+
+    def __init__(self, df: pd.DataFrame, columna: str = 'NUM_DOCUMENTO'):
+        self._iniciar(_agrupar_posiciones(df[columna]), len(df))
+
+    @classmethod
+    def desde_grupo(cls, grupo: tuple, n_filas: int) -> 'IndiceEstudiantes':
+        """Índice a partir de ``(orden, valores, limites)`` ya calculados (ver compartido.py)."""
+        indice = cls.__new__(cls)
+        indice._iniciar(grupo, n_filas)
+        return indice
+
+    @classmethod
+    def combinar(cls, partes: list) -> 'IndiceEstudiantes':
+        """Índice de la concatenación de las tablas indexadas por `partes`: los rangos
+        de un documento presente en varias partes se extienden con las filas de cada una."""
+        longitudes = [parte.n_filas for parte in partes]
+        return cls.desde_grupo(_combinar_grupos([parte.grupo for parte in partes], longitudes), sum(longitudes))
+
+    def _iniciar(self, grupo: tuple, n_filas: int) -> None:
+        self.grupo = grupo
+        self.n_filas = n_filas
+        self._orden, valores, limites = grupo
+        inicios, fines = limites[:-1].tolist(), limites[1:].tolist()
+        self._rangos = {valor: (inicio, fin) for valor, inicio, fin in zip(valores, inicios, fines)}
+
+    def __contains__(self, codigo) -> bool:
+        return codigo in self._rangos
+
+    def __len__(self) -> int:
+        return len(self._rangos)
+
+    def filas(self, df: pd.DataFrame, codigo) -> pd.DataFrame | None:
+        """Filas de `df` del estudiante `codigo` (None si no existe)."""
+        rango = self._rangos.get(codigo)
+        if rango is None:
+            return None
+        return df.take(self._orden[rango[0]:rango[1]])
+
+
+class JerarquiaFiltros:
+    """Opciones de los filtros en cascada (región -> IEM -> grado).
+
+    Se construye una vez por versión a partir de las combinaciones distintas
+    de las columnas de filtro (unas pocas miles de filas aunque los datos
+    tengan millones). Las listas de opciones quedan precalculadas y
+    ``existe(filtros)`` responde si una selección tiene filas sin tocar los
+    datos, para no correr agregaciones que solo producirían gráficos vacíos.
+    Un vacío en una columna solo excluye la fila de las opciones y consultas
+    de esa columna, no de las demás.
+    """
+
+    @classmethod
+    def combinar(cls, partes: list) -> 'JerarquiaFiltros':
+        """Jerarquía de la concatenación de las tablas de `partes`, a partir de sus combinaciones."""
+        return cls(pd.concat([parte._combinaciones for parte in partes], ignore_index=True),
+                   columnas=partes[0].columnas)
+
+    def __init__(self, df: pd.DataFrame, columnas=COLUMNAS_FILTRO):
+        self.columnas = tuple(c for c in columnas if c in df.columns)
+        # Las opciones mantienen el orden de aparición en los datos (como Series.unique)
+        self._combinaciones = df[list(self.columnas)].drop_duplicates().astype(object)
+
+        self._opciones = {col: self._unicos(self._combinaciones, col) for col in self.columnas}
+        self._iems = {None: self._opciones['NOMBRE IEM']}
+        self._grados = {(None, None): sorted(self._opciones['GRADO'])}
+        for region, grupo in self._combinaciones.groupby('REGION', sort=False):
+            self._iems[region] = self._unicos(grupo, 'NOMBRE IEM')
+            self._grados[(region, None)] = sorted(self._unicos(grupo, 'GRADO'))
+        # Una IEM puede aparecer con el mismo nombre en varias regiones: sin región
+        # seleccionada se ofrecen los grados de todas
+        for iem, grupo in self._combinaciones.groupby('NOMBRE IEM', sort=False):
+            self._grados[(None, iem)] = sorted(self._unicos(grupo, 'GRADO'))
+        for (region, iem), grupo in self._combinaciones.groupby(['REGION', 'NOMBRE IEM'], sort=False):
+            self._grados[(region, iem)] = sorted(self._unicos(grupo, 'GRADO'))
+        self._proyecciones = {}
+
+    @staticmethod
+    def _unicos(df: pd.DataFrame, columna: str) -> list:
+        return pd.unique(df[columna].dropna()).tolist()
+
+    # ---------------- Opciones ----------------
+    def opciones(self, columna: str) -> list:
+        """Todos los valores de `columna`, en orden de aparición."""
+        return self._opciones[columna]
+
+    def iems(self, region=None) -> list:
+        """IEM de la región (o de todas)."""
+        return self._iems.get(region, [])
+
+    def grados(self, region=None, iem=None) -> list:
+        """Grados presentes en la región y la IEM seleccionadas."""
+        return self._grados.get((region, iem), [])
+
+    # ---------------- Selecciones vacías ----------------
+    def existe(self, filtros: dict) -> bool:
+        """True si alguna fila cumple todos los `filtros` ({columna: valor})."""
+        columnas = tuple(sorted(filtros))
+        if not columnas:
+            return len(self._combinaciones) > 0
+        presentes = self._proyecciones.get(columnas)
+        if presentes is None:
+            # Una vez por subconjunto de columnas filtradas; después la consulta es O(1)
+            proyeccion = self._combinaciones[list(columnas)].dropna()
+            presentes = set(proyeccion.itertuples(index=False, name=None))
+            self._proyecciones[columnas] = presentes
+        return tuple(filtros[c] for c in columnas) in presentes
@@ -0,0 +1,226 @@
+# ingesta.py
+# Capa de ingesta de las calificaciones.
+# El Excel se convierte una sola vez en un snapshot Parquet (columnar) que se
+# reutiliza mientras el archivo fuente no cambie. Leer el Parquet toma
+# milisegundos frente a los segundos que tarda openpyxl con el libro completo.
+
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+
+import config
+
+log = logging.getLogger(__name__)
+
+# El snapshot requiere pyarrow; sin él se lee el Excel directamente.
+PARQUET_DISPONIBLE = importlib.util.find_spec('pyarrow') is not None
+
+# ---------------- Esquema de tipos ----------------
+# Columnas de texto con pocos valores distintos: como categorías cada fila
+# guarda un código entero en vez de un objeto str de Python.
+COLUMNAS_CATEGORICAS = [
+    'REGION', 'NOMBRE IEM', 'MUNICIPIO', 'EVALUACION', 'COMPETENCIA',
+    'COMPETENCIA_PTIES', 'EVIDENCIA', 'NIVEL_DE_DESEMPENO', 'GENERO',
+    'NUM_DOCUMENTO',
+]
+
+
+def memoria_mb(df: pd.DataFrame) -> float:
+    """Memoria real ocupada por el DataFrame (incluye el contenido de los str)."""
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def _como_texto(serie: pd.Series) -> pd.Series:
+    """Convierte códigos numéricos (p. ej. 1234.0 leído de Excel) a texto sin decimales."""
+    if pd.api.types.is_float_dtype(serie) and (serie.dropna() % 1 == 0).all():
+        serie = serie.astype('Int64')
+    return serie.astype(str).where(serie.notna())
+
+
+def aplicar_esquema(df: pd.DataFrame) -> pd.DataFrame:
+    """Aplica los tipos compactos de ESQUEMA y reporta la memoria antes y después.
+
+    - Columnas de COLUMNAS_CATEGORICAS -> category
+    - GRADO -> entero pequeño (int8)
+    - CALIFICACION -> float32
+    - NUM_DOCUMENTO se normaliza a texto antes de volverlo categoría, porque
+      el código se compara con lo que el usuario escribe en la app.
+
+    Es idempotente: sobre un DataFrame ya compacto no hace nada costoso.
+    """
+    pendientes = [c for c in COLUMNAS_CATEGORICAS
+                  if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype)]
+    grado = 'GRADO' in df.columns and df['GRADO'].dtype.itemsize > 1
+    calificacion = 'CALIFICACION' in df.columns and df['CALIFICACION'].dtype != 'float32'
+    if not (pendientes or grado or calificacion):
+        return df
+
+    antes = memoria_mb(df)
+    df = df.copy(deep=False)
+    for col in pendientes:
+        if col == 'NUM_DOCUMENTO' and not pd.api.types.is_string_dtype(df[col]):
+            df[col] = _como_texto(df[col])
+        df[col] = df[col].astype('category')
+    if grado:
+        # Si hay grados vacíos downcast deja el flotante
+        df['GRADO'] = pd.to_numeric(df['GRADO'], downcast='integer')
+    if calificacion:
+        df['CALIFICACION'] = df['CALIFICACION'].astype('float32')
+
+    despues = memoria_mb(df)
+    df.attrs['memoria_mb'] = {'antes': round(float(antes), 2), 'despues': round(float(despues), 2)}
+    log.info('Memoria de los datos: %.1f MB -> %.1f MB (%.1fx)', antes, despues, antes / max(despues, 1e-9))
+    return df
+
+
+def _leer_fuente(ruta: Path) -> pd.DataFrame:
+    """Lee un libro de Excel, un CSV o un Parquet de calificaciones, según la extensión."""
+    if ruta.suffix.lower() == '.csv':
+        return pd.read_csv(ruta)
+    if ruta.suffix.lower() == '.parquet':
+        return pd.read_parquet(ruta)
+    return pd.read_excel(ruta)
+
+
+def unir_categorias(partes: list[pd.DataFrame]) -> list[pd.DataFrame]:
+    """Da a cada columna categórica las mismas categorías en todas las partes.
+
+    ``pd.concat`` convierte a object las categorías que no coinciden entre
+    partes. Las categorías unidas quedan ordenadas, como las de un solo archivo
+    (astype('category')): el orden de las competencias en tablas y gráficos
+    no depende del orden de los archivos.
+    """
+    categoricas = {}
+    for parte in partes:
+        for col in parte.columns:
+            if isinstance(parte[col].dtype, pd.CategoricalDtype):
+                categoricas.setdefault(col, []).append(parte[col].cat.categories)
+    categorias = {col: listas[0].append(listas[1:]).unique().sort_values() for col, listas in categoricas.items()}
+    return [
+        parte.assign(**{col: parte[col].cat.set_categories(cats)
+                        for col, cats in categorias.items() if col in parte.columns})
+        for parte in partes
+    ]
+
+
+def concatenar(partes: list[pd.DataFrame]) -> pd.DataFrame:
+    """Une varios DataFrames ya compactos sin perder las columnas categóricas."""
+    df = pd.concat(unir_categorias(partes), ignore_index=True)
+    df.attrs = {}
+    return aplicar_esquema(df)
+
+
+def _hash_archivo(ruta: Path, bloque: int = 1 << 20) -> str:
+    """SHA-256 del contenido del archivo, leído por bloques."""
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for trozo in iter(lambda: f.read(bloque), b''):
+            h.update(trozo)
+    return h.hexdigest()
+
+
+def _dir_snapshots() -> Path:
+    return config.DIR_CACHE / 'snapshots'
+
+
+def _prefijo(ruta: Path) -> str:
+    """Nombre base de los snapshots de `ruta` (distingue archivos homónimos en otras carpetas)."""
+    ubicacion = hashlib.sha1(str(ruta.resolve()).encode()).hexdigest()[:10]
+    return f'{ruta.stem}-{ubicacion}'
+
+
+def escribir_atomico(destino: Path, escribir) -> None:
+    """Llama a `escribir(tmp)` con un temporal junto a `destino` y lo renombra a `destino`.
+
+    Otro proceso nunca lee un archivo a medias, y el temporal lleva el pid para
+    que varios procesos que escriben el mismo archivo a la vez no se pisen.
+    Si `escribir` falla, el temporal se borra y el error se propaga.
+    """
+    tmp = destino.with_name(f'.{destino.name}.{os.getpid()}.tmp')
+    tmp.unlink(missing_ok=True)  # resto de un proceso anterior con el mismo pid
+    try:
+        escribir(tmp)
+        os.replace(tmp, destino)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _leer_meta(meta: Path) -> dict | None:
+    try:
+        return json.loads(meta.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _leer_snapshot(info: dict) -> pd.DataFrame | None:
+    try:
+        return pd.read_parquet(_dir_snapshots() / info['parquet'])
+    except Exception as e:  # snapshot borrado o corrupto: se reconstruye
+        log.warning('No se pudo leer el snapshot %s: %s', info.get('parquet'), e)
+        return None
+
+
+def _guardar_snapshot(df: pd.DataFrame, ruta: Path, meta: Path, info: dict) -> None:
+    """Guarda el Parquet (nombrado por su hash) y luego la metadata que apunta a él."""
+    directorio = _dir_snapshots()
+    try:
+        directorio.mkdir(parents=True, exist_ok=True)
+        parquet = directorio / info['parquet']
+        if not parquet.exists():
+            escribir_atomico(parquet, lambda p: df.to_parquet(p, index=False))
+        escribir_atomico(meta, lambda p: p.write_text(json.dumps(info)))
+    except Exception as e:  # sin permisos, tipos mixtos, etc.: la app sigue sin snapshot
+        log.warning('No se pudo guardar el snapshot de %s: %s', ruta, e)
+        return
+    # Los snapshots de versiones anteriores ya no se usan
+    for viejo in directorio.glob(f'{_prefijo(ruta)}-*.parquet'):
+        if viejo.name != info['parquet']:
+            viejo.unlink(missing_ok=True)
+
+
+def leer_datos(filepath) -> pd.DataFrame:
+    """Lee el libro de calificaciones (Excel, CSV o Parquet) pasando por el snapshot Parquet.
+
+    El snapshot se identifica por el mtime y el tamaño del archivo; si estos
+    cambian se compara el hash del contenido y solo se vuelve a leer el Excel
+    cuando el contenido realmente cambió. El snapshot se guarda ya con el
+    esquema compacto (ver `aplicar_esquema`). La versión de los datos (hash)
+    queda en ``df.attrs['version']``.
+    """
+    ruta = Path(filepath)
+    if not PARQUET_DISPONIBLE:
+        df = aplicar_esquema(_leer_fuente(ruta))
+        df.attrs['version'] = _hash_archivo(ruta)[:16]
+        return df
+
+    estado = ruta.stat()
+    firma = {'mtime_ns': estado.st_mtime_ns, 'tamano': estado.st_size}
+    meta = _dir_snapshots() / f'{_prefijo(ruta)}.json'
+    info = _leer_meta(meta)
+
+    df = None
+    if info and all(info.get(k) == v for k, v in firma.items()):
+        df = _leer_snapshot(info)
+    if df is None:
+        huella = _hash_archivo(ruta)
+        if info and info.get('sha256') == huella:
+            # El archivo se tocó pero el contenido es el mismo: basta con renovar la firma
+            df = _leer_snapshot(info)
+        if df is None:
+            log.info('Convirtiendo %s a Parquet', ruta)
+            df = aplicar_esquema(_leer_fuente(ruta))
+        info = {'sha256': huella, 'parquet': f'{_prefijo(ruta)}-{huella[:16]}.parquet', **firma,
+                'memoria_mb': df.attrs.get('memoria_mb', (info or {}).get('memoria_mb'))}
+        _guardar_snapshot(df, ruta, meta, info)
+
+    # El Parquet ya guarda los tipos compactos; esto solo cubre snapshots viejos
+    df = aplicar_esquema(df)
+    df.attrs.setdefault('memoria_mb', info.get('memoria_mb'))
+    df.attrs['version'] = info['sha256'][:16]
+    return df
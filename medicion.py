@@ -0,0 +1,100 @@
+# medicion.py
+# Tiempos por sección de la app.
+# Cada ejecución (rerun) de una sesión lleva un TiemposEjecucion: cada bloque
+# de la página se envuelve en ``with tiempos.seccion('nombre') as m`` (o se
+# decora con ``@tiempos.medida('nombre')``) y se registra su duración, las filas que procesó y los bytes que envía al
+# navegador (si se conocen). Cada medición se emite además como una línea
+# JSON en el logger "pties.tiempos" y se acumula en un HistorialTiempos del
+# proceso, que resume percentiles por sección para detectar regresiones.
+
+import functools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger('pties.tiempos')
+
+
+@dataclass
+class Medicion:
+    seccion: str
+    ms: float = 0.0
+    filas: int | None = None
+    bytes: int | None = None
+
+
+class HistorialTiempos:
+    """Últimas `maximo` mediciones de cada sección en el proceso (todas las sesiones)."""
+
+    def __init__(self, maximo: int = 500):
+        self._ms = {}
+        self._maximo = maximo
+        self._lock = threading.Lock()
+
+    def agregar(self, medicion: Medicion) -> None:
+        with self._lock:
+            self._ms.setdefault(medicion.seccion, deque(maxlen=self._maximo)).append(medicion.ms)
+
+    def resumen(self) -> pd.DataFrame:
+        """n, p50, p95 y máximo (ms) por sección."""
+        with self._lock:
+            muestras = {seccion: np.fromiter(valores, float) for seccion, valores in self._ms.items()}
+        filas = [
+            {'seccion': seccion, 'n': len(ms), 'p50_ms': np.percentile(ms, 50),
+             'p95_ms': np.percentile(ms, 95), 'max_ms': ms.max()}
+            for seccion, ms in muestras.items()
+        ]
+        return pd.DataFrame(filas, columns=['seccion', 'n', 'p50_ms', 'p95_ms', 'max_ms']).set_index('seccion')
+
+
+class TiemposEjecucion:
+    """Mediciones de una ejecución de la página.
+
+    `contexto` (p. ej. sesión y versión de los datos) se agrega a cada línea
+    de log. Si una sección se vuelve a medir (un fragmento que se reejecuta)
+    la medición nueva reemplaza a la anterior.
+    """
+
+    def __init__(self, contexto: dict | None = None, historial: HistorialTiempos | None = None):
+        self.contexto = contexto or {}
+        self.historial = historial
+        self.mediciones = {}
+
+    @contextmanager
+    def seccion(self, nombre: str, filas: int | None = None):
+        medicion = Medicion(nombre, filas=filas)
+        inicio = time.perf_counter()
+        try:
+            yield medicion
+        finally:
+            medicion.ms = (time.perf_counter() - inicio) * 1000
+            self.mediciones[nombre] = medicion
+            if self.historial is not None:
+                self.historial.agregar(medicion)
+            if log.isEnabledFor(logging.INFO):
+                log.info(json.dumps({'evento': 'seccion', **self.contexto, **asdict(medicion)}, ensure_ascii=False))
+
+    def medida(self, nombre: str):
+        """Decorador: mide cada llamada a la función como la sección `nombre`."""
+        def decorar(funcion):
+            @functools.wraps(funcion)
+            def envuelta(*args, **kwargs):
+                with self.seccion(nombre):
+                    return funcion(*args, **kwargs)
+            return envuelta
+        return decorar
+
+    def tabla(self) -> pd.DataFrame:
+        """Mediciones de esta ejecución, en el orden en que se tomaron."""
+        filas = [asdict(m) for m in self.mediciones.values()]
+        return pd.DataFrame(filas, columns=['seccion', 'ms', 'filas', 'bytes']).set_index('seccion')
+
+    def total_ms(self) -> float:
+        return sum(m.ms for m in self.mediciones.values())
@@ -0,0 +1,31 @@
+# reportes.py
+# Almacén de los informes socioemocionales en PDF (carpeta SOCIOE/).
+# La carpeta se indexa una sola vez y cada PDF se lee del disco la primera vez
+# que alguien lo descarga; después todas las sesiones comparten los mismos bytes.
+
+import threading
+from pathlib import Path
+
+
+class AlmacenReportes:
+    """Índice municipio -> PDF de SOCIOE, con el contenido cargado bajo demanda."""
+
+    def __init__(self, directorio):
+        self.directorio = Path(directorio)
+        self._rutas = {ruta.stem: ruta for ruta in self.directorio.glob('*.pdf')}
+        self._contenidos = {}
+        self._lock = threading.Lock()
+
+    def municipios(self) -> list[str]:
+        """Municipios que tienen informe, en orden alfabético."""
+        return sorted(self._rutas)
+
+    def __contains__(self, municipio) -> bool:
+        return municipio in self._rutas
+
+    def contenido(self, municipio: str) -> bytes:
+        """Bytes del PDF del municipio; se leen del disco una sola vez por proceso."""
+        with self._lock:
+            if municipio not in self._contenidos:
+                self._contenidos[municipio] = self._rutas[municipio].read_bytes()
+            return self._contenidos[municipio]